@@ -0,0 +1,48 @@
+import os
+from pymongo import UpdateOne
+from culvert_name_matcher import alias_key, normalize_name
+
+ALIAS_MIN_SIMILARITY = float(os.getenv('ALIAS_MIN_SIMILARITY', 0.8))
+
+class AliasTable:
+    def __init__(self, collection):
+        self.collection = collection
+        self.aliases = None
+
+    def read_aliases(self):
+        return {doc["_id"]: doc["name_lower"] for doc in self.collection.find({}, {"name_lower": 1})}
+
+    def write_aliases(self, learned):
+        self.collection.bulk_write([
+            UpdateOne({"_id": key}, {"$set": {"name_lower": name_lower}}, upsert=True)
+            for key, name_lower in learned.items()
+        ])
+
+    def delete_aliases(self, name_lower):
+        return self.collection.delete_many({"name_lower": name_lower}).deleted_count
+
+    def load(self):
+        if self.aliases is None:
+            self.aliases = self.read_aliases()
+        return self.aliases
+
+    def learn(self, linked_names, defined_names):
+        aliases = self.load()
+        defined_by_name = {normalize_name(defined["name"]): defined["name"].lower() for defined in defined_names}
+        learned = {}
+        for similarity, member_name, ocr in linked_names:
+            if similarity < ALIAS_MIN_SIMILARITY or defined_by_name.get(normalize_name(ocr[0]), member_name.lower()) != member_name.lower():
+                continue
+            key = alias_key(ocr[0], ocr[1])
+            if aliases.get(key) != member_name.lower():
+                learned[key] = member_name.lower()
+        if learned:
+            self.write_aliases(learned)
+            aliases.update(learned)
+        return len(learned)
+
+    def forget(self, name_lower):
+        deleted = self.delete_aliases(name_lower)
+        if self.aliases is not None:
+            self.aliases = {key: value for key, value in self.aliases.items() if value != name_lower}
+        return deleted
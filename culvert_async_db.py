@@ -0,0 +1,31 @@
+import os
+import asyncio
+import inspect
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+
+DB_WORKERS = int(os.getenv('DB_WORKERS', 8))
+
+db_executor = None
+
+def get_db_executor():
+    global db_executor
+    if db_executor is None:
+        db_executor = ThreadPoolExecutor(max_workers=DB_WORKERS, thread_name_prefix="culvert-db")
+    return db_executor
+
+async def run_db(func, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_db_executor(), partial(func, *args, **kwargs))
+
+class AsyncProxy:
+    def __init__(self, target):
+        self.target = target
+
+    def __getattr__(self, name):
+        attr = getattr(self.target, name)
+        if not inspect.ismethod(attr):
+            return attr
+        async def call(*args, **kwargs):
+            return await run_db(attr, *args, **kwargs)
+        return call
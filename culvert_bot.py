@@ -1,6 +1,5 @@
 import os
 import io
-import certifi
 import math
 import json
 from matplotlib.image import thumbnail
@@ -14,10 +13,14 @@ from matplotlib.backends.backend_agg import FigureCanvasAgg as FigureCanvas
 from dotenv import load_dotenv
 from interactions import Client, Intents, OptionType, Embed, File, Permissions, SlashContext, SlashCommand, SlashCommandOption, listen, slash_default_member_permission
 from interactions.ext.paginators import Paginator
-from culvert_processor import get_culvert_scores
-from culvert_name_matcher import link_names
+from culvert_reader import stream_culvert_screenshots, merge_overlapping_rows, start_ocr_executor
+from culvert_downloader import close_http_session
+from culvert_name_matcher import link_names_optimal
+from culvert_class_catalog import class_catalog
+from culvert_storage import open_storage, STORAGE_BACKEND
+from culvert_async_db import AsyncProxy
+from culvert_roster import RosterCache
 from openai_generator import story_generator
-from pymongo.mongo_client import MongoClient
 from datetime import datetime
 from PIL import Image
 from collections import deque, Counter
@@ -207,6 +210,57 @@ async def continuous_ping(servers, delay, ping_ch, bot):
 
         await asyncio.sleep(delay)
 
+async def read_screenshots_with_progress(embed_update_message, screenshots):
+    loop = asyncio.get_running_loop()
+    start_time = loop.time()
+    last_edit_time = start_time
+    screenshot_reads = {}
+    screenshot_status = {index: "\U000023F3 Reading" for index, _ in screenshots}
+    screenshot_stream = stream_culvert_screenshots([culv_sc_img.url for _, culv_sc_img in screenshots])
+    try:
+        async for position, culv_sc_read, duplicate_of in screenshot_stream:
+            index = screenshots[position][0]
+            if duplicate_of is not None:
+                screenshot_reads[index] = []
+                screenshot_status[index] = f"\U000023ED Duplicate of #{screenshots[duplicate_of][0]}"
+            elif not culv_sc_read:
+                title_screenshot_mess = 'Messy Screenshot!'
+                description_screenshot_mess = f'Screenshot #{index} might be messy. Try changing the area of which you take the screenshot.'
+                color_screenshot_mess = '#FF0000'
+                thumbnail_screenshot_mess = embed_thumbnails["sugar_fail"]
+                embed_screenshot_mess = create_embed(title_screenshot_mess, description=description_screenshot_mess, color=color_screenshot_mess, thumbnail=thumbnail_screenshot_mess)
+                await embed_update_message.edit(embed=embed_screenshot_mess)
+                return None
+            else:
+                screenshot_reads[index] = culv_sc_read
+                screenshot_status[index] = f"\U00002705 {len(culv_sc_read)} rows"
+
+            elapsed = loop.time() - start_time
+            if loop.time() - last_edit_time < 1 and len(screenshot_reads) != len(screenshots):
+                continue
+            last_edit_time = loop.time()
+            title_progress = "Reading your culvert scores!"
+            description_progress = f"{len(screenshot_reads)} of {len(screenshots)} screenshots read in {elapsed:.1f}s."
+            color_progress = "#FF9900"
+            thumbnail_progress = embed_thumbnails["sugar_inprogress"]
+            fields_progress = [
+                {
+                    "name": "Screenshot",
+                    "value": "\n".join(f"#{index}" for index in screenshot_status),
+                    "inline": True
+                },
+                {
+                    "name": "Status",
+                    "value": "\n".join(screenshot_status.values()),
+                    "inline": True
+                }
+            ]
+            embed_progress = create_embed(title_progress, description=description_progress, color=color_progress, thumbnail=thumbnail_progress, field=fields_progress)
+            await embed_update_message.edit(embed=embed_progress)
+    finally:
+        await screenshot_stream.aclose()
+    return merge_overlapping_rows([screenshot_reads[index] for index, _ in screenshots])
+
 load_dotenv()
 TOKEN = os.getenv('DISCORD_TOKEN')
 URI = os.getenv('APP_URI')
@@ -220,6 +274,7 @@ MOD_ROLE = os.getenv('MOD_ROLE')
 ALLOWED_CHANNELS_STR = os.getenv('ALLOWED_CHANNELS')
 ALLOWED_CHANNELS = ALLOWED_CHANNELS_STR.split(',') if ALLOWED_CHANNELS_STR else []
 FATAL_CHANNEL = os.getenv('FATAL_CHANNEL')
+LINK_MIN_SIMILARITY = float(os.getenv('LINK_MIN_SIMILARITY', 0.3))
 
 servers = [
     (1, ("35.155.204.207", 8585)),
@@ -271,17 +326,6 @@ bottom_5_history = deque(maxlen=75)
 with open("embed_thumbnails.json", "r") as file:
     embed_thumbnails = json.load(file)
 
-db_client = MongoClient(URI, tlsCAFile=certifi.where())
-try:
-    db_client.admin.command('ping')
-    print("Connected to MongoDB.")
-except Exception as e:
-    print(e)
-
-db_culvert = db_client['culvert-score-database']
-collection_scores = db_culvert['player-scores']
-collection_names = db_culvert['player-names']
-
 bot = Client(intents=Intents.PRIVILEGED | Intents.GUILDS)
 member_cmd = SlashCommand(name="member", description="Add, remove, update, or search members in the database.", default_member_permissions=Permissions.ADMINISTRATOR, scopes=[SAGA_SERVER_ID, TEST_SERVER_ID])
 culvert_cmd = SlashCommand(name="culvert", description="Update, remove, or change culvert scores for members.", default_member_permissions=Permissions.ADMINISTRATOR, scopes=[SAGA_SERVER_ID, TEST_SERVER_ID])
@@ -296,6 +340,10 @@ async def on_ready():
     print(f"This bot is owned by {bot.owner}")
     asyncio.create_task(continuous_ping(servers, 20, FATAL_CHANNEL, bot))
 
+@listen()
+async def on_disconnect():
+    await close_http_session()
+
 # @test_cmd.subcommand(
 #     sub_cmd_name="addrole",
 #     options=[
@@ -334,10 +382,11 @@ async def on_ready():
     ]
 )
 async def add_member(ctx: SlashContext, guild_member: str, guild_member_class: str, guild_member_discord: str=None):  
-    if collection_names.find_one({"name_lower": guild_member.lower()}) is None:
+    if await member_repository.find(guild_member) is None:
         member_discord_id = guild_member_discord if guild_member_discord else None
         member_data = {"name": guild_member.strip(), "class": guild_member_class.lower().strip(), "discord_id": member_discord_id, "name_lower": guild_member.strip().lower()}
-        collection_names.insert_one(member_data)
+        await member_repository.add(member_data)
+        roster.put(member_data)
 
         title_success = 'Add successful.'
         color_success = '#2bff00'
@@ -382,12 +431,16 @@ async def add_member(ctx: SlashContext, guild_member: str, guild_member_class: s
     ]
 )
 async def remove_member(ctx: SlashContext, guild_member: str):
-    query = {"name_lower": guild_member.lower()}
-    member = collection_names.find_one(query)
+    member = await member_repository.find(guild_member)
     if member:
-        removed_member = collection_names.delete_one(query)
-        removed_member_scores = collection_scores.delete_one({"name": guild_member.lower()})
-        if removed_member.deleted_count == 1 and removed_member_scores.deleted_count == 1:
+        removed_member = await member_repository.remove(guild_member)
+        roster.remove(guild_member.lower())
+        await alias_table.forget(guild_member.lower())
+        member_history = await score_repository.find_member(guild_member)
+        removed_member_scores = await score_repository.delete_member(guild_member)
+        if member_history:
+            await leaderboards.refresh(member_history["date"])
+        if removed_member and removed_member_scores:
             title_success = 'Removal successful.'
             description_success = f'Successfully removed {guild_member}.'
             color_success = '#2bff00'
@@ -439,22 +492,22 @@ async def remove_member(ctx: SlashContext, guild_member: str):
     ]
 )
 async def update_member(ctx: SlashContext, guild_member: str, guild_member_updated: str=None, class_updated: str=None, discord_updated: str=None, level_updated: int=None):  
-    query = {"name_lower": guild_member.lower()}
-    member = collection_names.find_one(query)
+    member = await member_repository.find(guild_member)
     if member:
         member_name = guild_member_updated if guild_member_updated else member["name"]
         member_class = class_updated if class_updated else member["class"]
         member_discord_id = discord_updated if discord_updated else member["discord_id"]
-        member_data = {"$set": 
-                        {
-                            "name": member_name.strip(), 
-                            "class": member_class.lower().strip(), 
-                            "discord_id": member_discord_id,
-                            "name_lower": member_name.strip().lower()
-                        }
-                    }
-        updated_member = collection_names.update_one(query, member_data)
-        if updated_member.matched_count:
+        member_data = {
+            "name": member_name.strip(),
+            "class": member_class.lower().strip(),
+            "discord_id": member_discord_id,
+            "name_lower": member_name.strip().lower()
+        }
+        updated_member = await member_repository.update(guild_member, member_data)
+        await alias_table.forget(guild_member.lower())
+        roster.remove(guild_member.lower())
+        roster.put(member_data)
+        if updated_member:
             title_success = 'Update successful.'
             color_success = '#2bff00'
             thumbnail_success = embed_thumbnails["sugar_done"]
@@ -477,18 +530,8 @@ async def update_member(ctx: SlashContext, guild_member: str, guild_member_updat
             ]
             embed_success = create_embed(title_success, color=color_success, thumbnail=thumbnail_success, field=fields_success)  
             await ctx.send(embed=embed_success)
-        query_scores = {"name": guild_member.lower()}
-        member_scores = collection_scores.find_one(query_scores)
-        if member_scores:
-            member_level = level_updated if level_updated else member_scores["level"]
-            scores_data = {"$set": 
-                    {
-                        "name": member_name.lower().strip(), 
-                        "class": member_class.lower().strip(), 
-                        "level": member_level
-                    }
-                }
-            updated_member = collection_scores.update_one(query_scores, scores_data)
+        if await score_repository.update_member(guild_member, member_name, member_class, level_updated):
+            await leaderboards.refresh((await score_repository.find_member(member_name))["date"])
     else:
         title_failure = 'Unable to update.'
         description_failure = f'The name "{guild_member}" doesn\'t exist.'
@@ -511,8 +554,7 @@ async def update_member(ctx: SlashContext, guild_member: str, guild_member_updat
     ]
 )
 async def search_member(ctx: SlashContext, guild_member: str):
-    query = {"name_lower": guild_member.lower()}
-    member = collection_names.find_one(query)
+    member = await member_repository.find(guild_member)
     if member:
         title_success = 'Member exists.'
         color_success = '#2bff00'
@@ -552,13 +594,11 @@ async def search_member(ctx: SlashContext, guild_member: str):
 
 @member_cmd.subcommand(sub_cmd_name="view", sub_cmd_description="View the details of the database.")
 async def view_member(ctx: SlashContext):
-    document_count = db_culvert["player-names"].count_documents({})
-    most_recent_document = collection_names.find().sort('_id', -1).limit(1)
-    names_sorted = collection_names.find().sort("name", 1)
+    document_count = await member_repository.count()
+    document_recent = await member_repository.latest()
+    names_sorted = await member_repository.find_all()
     embeds_pages = []
-    try:
-        document_recent = next(most_recent_document)
-    except StopIteration:
+    if document_recent is None:
         print("No documents found.")
 
     title_details = "Details of the current database."
@@ -699,13 +739,8 @@ async def ping(
     culv_sc_10: OptionType.ATTACHMENT = None,    
     culv_sc_11: OptionType.ATTACHMENT = None,    
     culv_sc_12: OptionType.ATTACHMENT = None):
-    def get_discord_id(list, name):
-        for member in list:
-            if member['name'] == name:
-                return member['discord_id']
-    culvert_data = []
-    player_name_data = collection_names.find({}, {"name": 1, "class": 1, "discord_id": 1})
-    player_name_list = [{"name": doc["name"], "class": doc["class"], "discord_id": doc["discord_id"]} for doc in player_name_data]
+    roster_members = await roster.load()
+    player_name_list = list(roster_members.values())
 
     title_update = "Reading your culvert scores!"
     description_update = "This could take up to 30 seconds."
@@ -714,22 +749,11 @@ async def ping(
     embed_update = create_embed(title_update, color=color_update, description=description_update, thumbnail=thumbnail_update)
     embed_update_message = await ctx.send(embed=embed_update)
 
-    for index in range(1, 13):
-        culv_sc_var = f'culv_sc_{index}'
-        culv_sc_img = locals().get(culv_sc_var)
-        if culv_sc_img is not None:
-            image_url = culv_sc_img.url
-            culv_sc_read = get_culvert_scores(image_url)
-            if culv_sc_read:
-                culvert_data.extend(get_culvert_scores(image_url))
-            else:
-                title_screenshot_mess = 'Messy Screenshot!'
-                description_screenshot_mess = f'Screenshot #{index} might be messy. Try changing the area of which you take the screenshot.'
-                color_screenshot_mess = '#FF0000'
-                thumbnail_screenshot_mess = embed_thumbnails["sugar_fail"]
-                embed_screenshot_mess = create_embed(title_screenshot_mess, description=description_screenshot_mess, color=color_screenshot_mess, thumbnail=thumbnail_screenshot_mess)
-                await embed_update_message.edit(embed=embed_screenshot_mess)
-                return -1
+    culv_sc_list = [culv_sc_1, culv_sc_2, culv_sc_3, culv_sc_4, culv_sc_5, culv_sc_6, culv_sc_7, culv_sc_8, culv_sc_9, culv_sc_10, culv_sc_11, culv_sc_12]
+    screenshots = [(index, culv_sc_img) for index, culv_sc_img in enumerate(culv_sc_list, start=1) if culv_sc_img is not None]
+    culvert_data = await read_screenshots_with_progress(embed_update_message, screenshots)
+    if culvert_data is None:
+        return -1
     names_flat = [sublist[0] for sublist in culvert_data if sublist]
     if len(names_flat) != len(set(names_flat)):
         title_duplicate_entry = 'Duplicate Entry!'
@@ -738,7 +762,7 @@ async def ping(
         thumbnail_duplicate_entry = embed_thumbnails["sugar_fail"]
         embed_duplicate_entry = create_embed(title_duplicate_entry, description=description_duplicate_entry, color=color_duplicate_entry, thumbnail=thumbnail_duplicate_entry)
         await embed_update_message.edit(embed=embed_duplicate_entry)
-    elif len(culvert_data) != collection_names.count_documents({}):
+    elif len(culvert_data) != len(player_name_list):
         title_member_mismatch = 'Member mismatch!'
         description_member_mismatch = 'The number of guild members currently logged and the number of culvert scores read are not equal! Check to see if all your guild members are accounted for! Also make sure that your screenshots capture the whole culvert page! \n\n Use /cb member [add, remove, update, search] commands to help!'
         color_member_mismatch = '#FF0000'
@@ -751,21 +775,23 @@ async def ping(
             },
             {
                 "name": "# of Guild Members Logged",
-                "value": collection_names.count_documents({}),
+                "value": len(player_name_list),
                 "inline": True
             }
         ]
         embed_member_mismatch = create_embed(title_member_mismatch, description=description_member_mismatch, color=color_member_mismatch, thumbnail=thumbnail_member_mismatch, field=fields_member_mismatch)
         await embed_update_message.edit(embed=embed_member_mismatch)
     else:
-        linked_names = link_names(culvert_data, player_name_list)
+        linked_names, unmatched_members, unmatched_scores = link_names_optimal(culvert_data, player_name_list, LINK_MIN_SIMILARITY, await alias_table.load())
+        if unmatched_members or unmatched_scores:
+            print(f"Unmatched members: {[member['name'] for member in unmatched_members]}, unmatched scores: {[entry[0] for entry in unmatched_scores]}")
         channel = bot.get_channel(CULVERT_REMINDER_CH_ID)
         names_ping = "Don't forget to do your culvert please!!\n\n"
         if channel:
             for entry in linked_names:
                 if entry[2][3] != 0:
                     continue
-                discord_id = get_discord_id(player_name_list, entry[1])
+                discord_id = roster_members[entry[1].lower()]["discord_id"]
                 if discord_id is None or discord_id == 0:
                     continue
                 print(f'{entry[1]} : {discord_id}')
@@ -896,9 +922,8 @@ async def updateAll(
             await ctx.send(embed=embed_fail)
             return -1
 
-    culvert_data = []
-    player_name_data = collection_names.find({}, {"name": 1, "class": 1, "discord_id": 1, "name_lower": 1})
-    player_name_list = [{"name": doc["name"], "class": doc["class"], "discord_id": doc["discord_id"], "name_lower": doc["name_lower"]} for doc in player_name_data]
+    roster_members = await roster.load()
+    player_name_list = list(roster_members.values())
 
     title_update = "Reading your culvert scores!"
     description_update = "This could take up to 30 seconds."
@@ -907,22 +932,11 @@ async def updateAll(
     embed_update = create_embed(title_update, color=color_update, description=description_update, thumbnail=thumbnail_update)
     embed_update_message = await ctx.send(embed=embed_update)
 
-    for index in range(1, 13):
-        culv_sc_var = f'culv_sc_{index}'
-        culv_sc_img = locals().get(culv_sc_var)
-        if culv_sc_img is not None:
-            image_url = culv_sc_img.url
-            culv_sc_read = get_culvert_scores(image_url)
-            if culv_sc_read:
-                culvert_data.extend(get_culvert_scores(image_url))
-            else:
-                title_screenshot_mess = 'Messy Screenshot!'
-                description_screenshot_mess = f'Screenshot #{index} might be messy. Try changing the area of which you take the screenshot.'
-                color_screenshot_mess = '#FF0000'
-                thumbnail_screenshot_mess = embed_thumbnails["sugar_fail"]
-                embed_screenshot_mess = create_embed(title_screenshot_mess, description=description_screenshot_mess, color=color_screenshot_mess, thumbnail=thumbnail_screenshot_mess)
-                await embed_update_message.edit(embed=embed_screenshot_mess)
-                return -1
+    culv_sc_list = [culv_sc_1, culv_sc_2, culv_sc_3, culv_sc_4, culv_sc_5, culv_sc_6, culv_sc_7, culv_sc_8, culv_sc_9, culv_sc_10, culv_sc_11, culv_sc_12]
+    screenshots = [(index, culv_sc_img) for index, culv_sc_img in enumerate(culv_sc_list, start=1) if culv_sc_img is not None]
+    culvert_data = await read_screenshots_with_progress(embed_update_message, screenshots)
+    if culvert_data is None:
+        return -1
     names_flat = [sublist[0] for sublist in culvert_data if sublist]
     if len(names_flat) != len(set(names_flat)):
         title_duplicate_entry = 'Duplicate Entry!'
@@ -931,7 +945,7 @@ async def updateAll(
         thumbnail_duplicate_entry = embed_thumbnails["sugar_fail"]
         embed_duplicate_entry = create_embed(title_duplicate_entry, description=description_duplicate_entry, color=color_duplicate_entry, thumbnail=thumbnail_duplicate_entry)
         await embed_update_message.edit(embed=embed_duplicate_entry)
-    elif len(culvert_data) != collection_names.count_documents({}):
+    elif len(culvert_data) != len(player_name_list):
         title_member_mismatch = 'Member mismatch!'
         description_member_mismatch = 'The number of guild members currently logged and the number of culvert scores read are not equal! Check to see if all your guild members are accounted for! Also make sure that your screenshots capture the whole culvert page! \n\n Use /cb member [add, remove, update, search] commands to help!'
         color_member_mismatch = '#FF0000'
@@ -944,15 +958,36 @@ async def updateAll(
             },
             {
                 "name": "# of Guild Members Logged",
-                "value": collection_names.count_documents({}),
+                "value": len(player_name_list),
                 "inline": True
             }
         ]
         embed_member_mismatch = create_embed(title_member_mismatch, description=description_member_mismatch, color=color_member_mismatch, thumbnail=thumbnail_member_mismatch, field=fields_member_mismatch)
         await embed_update_message.edit(embed=embed_member_mismatch)
     else:
+        linked_names, unmatched_members, unmatched_scores = link_names_optimal(culvert_data, player_name_list, LINK_MIN_SIMILARITY, await alias_table.load())
+        if unmatched_members or unmatched_scores:
+            title_unmatched = 'Unmatched names!'
+            description_unmatched = 'Some culvert scores could not be confidently linked to a guild member. Check that these members\' names and classes are up to date, then try again! \n\n Use /cb member [add, remove, update, search] commands to help!'
+            color_unmatched = '#FF0000'
+            thumbnail_unmatched = embed_thumbnails["sugar_fail"]
+            fields_unmatched = [
+                {
+                    "name": "Unmatched Members",
+                    "value": "\n".join(member["name"] for member in unmatched_members)[:1024] or "N/A",
+                    "inline": True
+                },
+                {
+                    "name": "Unmatched Scores Read",
+                    "value": "\n".join(f"{entry[0]} ({entry[1]})" for entry in unmatched_scores)[:1024] or "N/A",
+                    "inline": True
+                }
+            ]
+            embed_unmatched = create_embed(title_unmatched, description=description_unmatched, color=color_unmatched, thumbnail=thumbnail_unmatched, field=fields_unmatched)
+            await embed_update_message.edit(embed=embed_unmatched)
+            return -1
         place = 1
-        linked_names = sorted(link_names(culvert_data, player_name_list), key=lambda x: x[2][3], reverse=True)
+        linked_names = sorted(linked_names, key=lambda x: x[2][3], reverse=True)
         members_raidboss = ctx.guild.get_role(CULVERT_RAID_BOSS).members
         members_raidassistant = ctx.guild.get_role(CULVERT_RAID_ASSISTANT).members
 
@@ -961,62 +996,39 @@ async def updateAll(
         for member in members_raidassistant:
             await member.remove_role(CULVERT_RAID_ASSISTANT)
 
+        stale_discord_ids = []
+        score_entries = []
         for entry in linked_names:
-            for member in player_name_list:
-                if member["name_lower"] == entry[1].lower():
-                    admin = 0
-                    if member["discord_id"] is not None and member["discord_id"] != "0":
-                        if ctx.guild.get_member(member["discord_id"]) is None:
-                            query = {"discord_id": member["discord_id"]}
-                            member_update = collection_names.find_one(query)
-                            if member_update:
-                                member_discord_id = 0
-                                member_data = {"$set": 
-                                                {
-                                                    "discord_id": member_discord_id
-                                                }
-                                            }
-                                updated_member = collection_names.update_one(query, member_data)
-                        else:
-                            for role in ctx.guild.get_member(member["discord_id"]).roles:
-                                if role.id == ADMIN_ROLE or role.id == MOD_ROLE:
-                                    admin = 1
-                            if admin != 1:
-                                if place == 1:
-                                    await ctx.guild.get_member(member["discord_id"]).add_role(CULVERT_RAID_BOSS)
-                                elif place >= 2 and place <= 6:
-                                    await ctx.guild.get_member(member["discord_id"]).add_role(CULVERT_RAID_ASSISTANT)
-                                place += 1
-            query = {"name": entry[1].lower()}
-            scores_doc = collection_scores.find_one(query)
-            if scores_doc:
-                date_to_add = entry[2][4] if not specified_date else specified_date
-                result = collection_scores.update_one(
-                    {"name": entry[1].lower()},
-                    {
-                        "$push": {
-                            "score": entry[2][3],
-                            "date": date_to_add
-                        },
-                        "$set": {
-                            "level": entry[2][2]
-                        }
-                    }
-                )
-            else:
-                result = collection_scores.insert_one(
-                    {
-                        "name": entry[1].lower(),
-                        "class": entry[2][1].lower(),
-                        "level": entry[2][2],
-                        "score": [entry[2][3]],
-                        "date": [date_to_add]
-                    }
-                )
+            member = roster_members.get(entry[1].lower())
+            if member:
+                admin = 0
+                if member["discord_id"] is not None and member["discord_id"] != "0":
+                    if ctx.guild.get_member(member["discord_id"]) is None:
+                        stale_discord_ids.append(member["discord_id"])
+                    else:
+                        for role in ctx.guild.get_member(member["discord_id"]).roles:
+                            if role.id == ADMIN_ROLE or role.id == MOD_ROLE:
+                                admin = 1
+                        if admin != 1:
+                            if place == 1:
+                                await ctx.guild.get_member(member["discord_id"]).add_role(CULVERT_RAID_BOSS)
+                            elif place >= 2 and place <= 6:
+                                await ctx.guild.get_member(member["discord_id"]).add_role(CULVERT_RAID_ASSISTANT)
+                            place += 1
+            date_to_add = entry[2][4] if not specified_date else specified_date
+            score_entries.append((entry[1], entry[2][3], date_to_add, entry[2][1], entry[2][2]))
+        if stale_discord_ids:
+            await member_repository.reset_discord_ids(stale_discord_ids)
+            roster.reset_discord_ids(stale_discord_ids)
+        ingest_report = await score_repository.add_scores(score_entries)
+        await leaderboards.refresh([score_entry[2] for score_entry in score_entries])
+        print(f"Logged {len(score_entries)} culvert scores: {ingest_report['inserted']} inserted, {ingest_report['modified']} modified.")
+        await alias_table.learn(linked_names, player_name_list)
         title_success = "Culvert scores read and logged!"
+        description_success = f"Logged {len(score_entries)} scores: {ingest_report['inserted']} inserted, {ingest_report['modified']} updated."
         color_success = "#2BFF00"
         thumbnail_success = embed_thumbnails["sugar_done"]
-        embed_success = create_embed(title_success, color=color_success, thumbnail=thumbnail_success)
+        embed_success = create_embed(title_success, description=description_success, color=color_success, thumbnail=thumbnail_success)
         await embed_update_message.edit(embed=embed_success)
 
 @culvert_cmd.subcommand(
@@ -1060,19 +1072,14 @@ async def updateOne(ctx: SlashContext, guild_member: str, date: str, score_updat
         await ctx.send(embed=embed_fail)
         return -1
 
-    query = {"name": guild_member.lower()}
-    member = collection_scores.find_one(query)
+    member = await score_repository.find_member(guild_member)
     if member:
         if date in member["date"]:
-            index = member["date"].index(date)
-            update = {"$set":
-                        {
-                            f"score.{index}": score_updated
-                        }
-                    }
-            member_updated = collection_scores.update_one(query, update)
-            if member_updated.matched_count:
-                member = collection_scores.find_one(query)
+            member_updated = await score_repository.update_score(guild_member, date, score_updated)
+            if member_updated:
+                await leaderboards.refresh([date])
+                member = await score_repository.find_member(guild_member)
+                index = member["date"].index(date)
                 title_success = 'Update successful.'
                 color_success = '#2bff00'
                 thumbnail_success = embed_thumbnails["sugar_done"]
@@ -1126,9 +1133,15 @@ async def updateOne(ctx: SlashContext, guild_member: str, date: str, score_updat
             required=True,
             type=OptionType.STRING
         ),
+        SlashCommandOption(
+            name="end_date",
+            description="Optional last date to remove, inclusive. Removes every date from target_date to end_date.",
+            required=False,
+            type=OptionType.STRING
+        ),
     ]
 )
-async def removeAll(ctx: SlashContext, target_date: str):
+async def removeAll(ctx: SlashContext, target_date: str, end_date: str=None):
     def is_valid_date(date_str):
         try:
             datetime.strptime(date_str, '%Y-%m-%d')
@@ -1136,7 +1149,7 @@ async def removeAll(ctx: SlashContext, target_date: str):
         except ValueError:
             return False
         
-    if not is_valid_date(target_date):
+    if not is_valid_date(target_date) or (end_date and not is_valid_date(end_date)):
         title_fail = 'Date is invalid.'
         description_fail = 'Enter the date in this format: YYYY-MM-DD.'
         color_fail = '#FF0000'
@@ -1145,36 +1158,25 @@ async def removeAll(ctx: SlashContext, target_date: str):
         await ctx.send(embed=embed_fail)
         return -1
     
+    date_range = f"{target_date} to {end_date}" if end_date else target_date
     title_inprogress = "Removing scores from the specified date!"
     description_inprogress = "This may take a few seconds."
     color_inprogress = "#FF9900"
     thumbnail_inprogress = embed_thumbnails["sugar_inprogress"]
     embed_inprogress = create_embed(title_inprogress, color=color_inprogress, description=description_inprogress, thumbnail=thumbnail_inprogress)
     embed_message = await ctx.send(embed=embed_inprogress)
-    members = collection_scores.find({"date": target_date})
-    if collection_scores.count_documents({"date": target_date}):
-        for member in members:
-            score_date_pairs = list(zip(member["score"], member["date"]))
-            filtered_pairs = [pair for pair in score_date_pairs if pair[1] != target_date]
-            if len(filtered_pairs) != len(score_date_pairs):
-                new_scores, new_dates = zip(*filtered_pairs) if filtered_pairs else ([], [])
-                collection_scores.update_one(
-                    {'_id': member['_id']},
-                    {'$set':
-                        {
-                            'score': new_scores,
-                            'date': new_dates
-                        }
-                    }
-                )
+    removed_count = await score_repository.remove_date(target_date, end_date)
+    await leaderboards.remove_dates(target_date, end_date)
+    if removed_count:
         title_success = 'Removed scores for all members at specified date.'
+        description_success = f"Removed {date_range} from {removed_count} records."
         color_success = '#2bff00'
         thumbnail_success = embed_thumbnails["sugar_done"]
-        embed_success = create_embed(title_success, color=color_success, thumbnail=thumbnail_success)
+        embed_success = create_embed(title_success, description=description_success, color=color_success, thumbnail=thumbnail_success)
         await embed_message.edit(embed=embed_success)
     else:
         title_fail = 'There are no members that contain that specified date.'
-        description_error = f"The date, {target_date}, has not been logged for any member."
+        description_error = f"The date, {date_range}, has not been logged for any member."
         color_fail = '#FF0000'
         thumbnail_fail = embed_thumbnails["sugar_fail"]
         embed_fail = create_embed(title_fail, color=color_fail, thumbnail=thumbnail_fail)
@@ -1216,24 +1218,11 @@ async def removeOne(ctx: SlashContext, name: str, target_date: str):
         await ctx.send(embed=embed_fail)
         return -1
     
-    member = collection_scores.find_one({"name": name.lower()})
+    member = await score_repository.find_member(name)
     if member:
         if target_date in member["date"]:
-            index = member["date"].index(target_date)
-            new_scores = member["score"][:]
-            new_dates = member["date"][:]
-            new_scores.pop(index)
-            new_dates.pop(index)
-            
-            collection_scores.update_one(
-                {"name": name},
-                {"$set":
-                    {
-                        "score": new_scores,
-                        "date": new_dates
-                    } 
-                }
-            )
+            await score_repository.remove_score(name, target_date)
+            await leaderboards.refresh([target_date])
             title_success = 'Removed score successfully!'
             color_success = '#2bff00'
             thumbnail_success = embed_thumbnails["sugar_done"]
@@ -1297,17 +1286,10 @@ async def addOne(ctx: SlashContext, name: str, date: str, score: int):
         await ctx.send(embed=embed_fail)
         return -1
     
-    member = collection_scores.find_one({"name": name.lower()})
+    member = await score_repository.find_member(name)
     if member:
-        result = collection_scores.update_one(
-            {"name": name},
-            {"$push":
-                {
-                    "score": score,
-                    "date": date
-                }
-            }
-        )
+        result = await score_repository.add_score(name, score, date)
+        await leaderboards.refresh([date])
         title_success = 'Score and date added!'
         color_success = '#2bff00'
         thumbnail_success = embed_thumbnails["sugar_done"]
@@ -1324,17 +1306,17 @@ async def addOne(ctx: SlashContext, name: str, date: str, score: int):
 
 @culvert_cmd.subcommand(sub_cmd_name="announce", sub_cmd_description="Announces the highlights of culvert this week.")
 async def announce(ctx: SlashContext):
-    player_scores_data = collection_scores.find({}, {"name": 1, "class": 1, "level": 1, "score": 1, "date": 1})
-    player_scores_list = [{"name": doc["name"], "class": doc["class"], "level": doc["level"], "score": doc["score"], "date": doc["date"]} for doc in player_scores_data]
+    player_scores_list = await score_repository.recent_histories(2)
+    roster_members = await roster.load()
     scores_sorted_curweek = sorted(player_scores_list, key=lambda x: x["score"][-1], reverse=True)
 
-    rank1_member = collection_names.find_one({"name_lower": scores_sorted_curweek[0]['name']})
+    rank1_member = roster_members[scores_sorted_curweek[0]['name']]
     rank1_story = f"<@!{rank1_member['discord_id']}>" if rank1_member['discord_id'] is not None else rank1_member['name']
     rank1_story_value = scores_sorted_curweek[0]['score'][-1]
-    rank2_member = collection_names.find_one({"name_lower": scores_sorted_curweek[1]['name']})
+    rank2_member = roster_members[scores_sorted_curweek[1]['name']]
     rank2_story = f"<@!{rank2_member['discord_id']}>" if rank2_member['discord_id'] is not None else rank2_member['name']
     rank2_story_value = scores_sorted_curweek[1]['score'][-1]
-    rank3_member = collection_names.find_one({"name_lower": scores_sorted_curweek[2]['name']})
+    rank3_member = roster_members[scores_sorted_curweek[2]['name']]
     rank3_story = f"<@!{rank3_member['discord_id']}>" if rank3_member['discord_id'] is not None else rank3_member['name']
     rank3_story_value = scores_sorted_curweek[2]['score'][-1]
 
@@ -1352,7 +1334,7 @@ async def announce(ctx: SlashContext):
             if biggest_improvement is None or improvement > biggest_improvement:
                 biggest_improvement_member = member
                 biggest_improvement = improvement
-    biggest_improvement_member_name = collection_names.find_one({"name_lower": biggest_improvement_member['name']})
+    biggest_improvement_member_name = roster_members[biggest_improvement_member['name']]
     biggest_improvement_member_story = f"@<!{biggest_improvement_member_name['discord_id']}>" if biggest_improvement_member_name['discord_id'] is not None else biggest_improvement_member_name['name']
 
     scores_lastweek_sorted = sorted(scores_lastweek, key=lambda x: x["score"][-2], reverse=True)
@@ -1365,13 +1347,13 @@ async def announce(ctx: SlashContext):
         if lowest_diff is None or abs(current_diff) < abs(lowest_diff):
             lowest_diff = current_diff
             lowest_diff_indices = (i-1, i)
-    lowest_diff_member0 = collection_names.find_one({"name_lower": scores_lastweek_sorted[lowest_diff_indices[0]]['name']})
-    lowest_diff_member1 = collection_names.find_one({"name_lower": scores_lastweek_sorted[lowest_diff_indices[1]]['name']})
+    lowest_diff_member0 = roster_members[scores_lastweek_sorted[lowest_diff_indices[0]]['name']]
+    lowest_diff_member1 = roster_members[scores_lastweek_sorted[lowest_diff_indices[1]]['name']]
     lowest_diff_story0 = f"<@!{lowest_diff_member0['discord_id']}>" if lowest_diff_member0['discord_id'] is not None else lowest_diff_member0['name']
     lowest_diff_story1 = f"<@!{lowest_diff_member1['discord_id']}>" if lowest_diff_member1['discord_id'] is not None else lowest_diff_member1['name']
     
-    lowest_diff_member0_score_currweek = collection_scores.find_one({"name":scores_lastweek_sorted[lowest_diff_indices[0]]['name']})['score'][-1]
-    lowest_diff_member1_score_currweek = collection_scores.find_one({"name":scores_lastweek_sorted[lowest_diff_indices[1]]['name']})['score'][-1]
+    lowest_diff_member0_score_currweek = scores_lastweek_sorted[lowest_diff_indices[0]]['score'][-1]
+    lowest_diff_member1_score_currweek = scores_lastweek_sorted[lowest_diff_indices[1]]['score'][-1]
     title_waitGPT = "Generating the story!"
     description_waitGPT = "This could take up to 30 seconds."
     color_waitGPT = "#FF9900"
@@ -1383,28 +1365,16 @@ async def announce(ctx: SlashContext):
 
 @culvert_cmd.subcommand(sub_cmd_name="changes", sub_cmd_description="Returns the top 5 biggest improvements from previous PR.")
 async def changes(ctx: SlashContext):
-    player_scores_data = collection_scores.find({}, {"name": 1, "class": 1, "level": 1, "score": 1, "date": 1})
-    player_scores_list = [{"name": doc["name"], "class": doc["class"], "level": doc["level"], "score": doc["score"], "date": doc["date"]} for doc in player_scores_data]
-    
-    greatest_change = []
-    for member in player_scores_list:
-        if len(member['score']) > 1 and member['score'][-1] != 0:
-            highest_score = max(member['score'][:-1])
-            if highest_score == 0:
-                continue
-            change = member['score'][-1] - highest_score
-            change_percent = change/highest_score*100
-            discord_id = collection_names.find_one({'name_lower': member['name']})['discord_id']
-            greatest_change.append({"name": member['name'], "change": change_percent, "discord_id": discord_id})
-    greatest_change_sorted = sorted(greatest_change, key=lambda x: x['change'], reverse=True)
+    greatest_change = await score_repository.top_improvements(5)
+    roster_members = await roster.load()
 
     name_list = ''
     change_list = ''
     discord_list = ''
-    for i in range(0, 5):
-        name_list += f'{greatest_change_sorted[i]['name']}\n'
-        change_list += f'{round(greatest_change_sorted[i]['change'], 2)}%\n'
-        discord_list += f'{greatest_change_sorted[i]['discord_id']}\n'
+    for member in greatest_change:
+        name_list += f'{member["name"]}\n'
+        change_list += f'{round(member["change"], 2)}%\n'
+        discord_list += f'{roster_members[member["name"]]["discord_id"]}\n'
     title_changes = "Top 5 Improvements from PR."
     color_changes = '#2bff00'
     thumbnail_changes = embed_thumbnails["sugar_done"]
@@ -1428,12 +1398,20 @@ async def changes(ctx: SlashContext):
     embed_list = create_embed(title=title_changes, color=color_changes, thumbnail=thumbnail_changes, field=field_changes)
     await ctx.send(embed=embed_list)
 
+@culvert_cmd.subcommand(sub_cmd_name="rebuild_totals", sub_cmd_description="Recomputes the guild's total culvert scores over time from every logged score.")
+async def rebuild_totals(ctx: SlashContext):
+    rebuilt_dates = await guild_totals.rebuild()
+    title_success = 'Guild totals rebuilt.'
+    description_success = f'Recomputed the totals for {rebuilt_dates} logged dates.'
+    color_success = '#2bff00'
+    thumbnail_success = embed_thumbnails["sugar_done"]
+    embed_success = create_embed(title_success, description=description_success, color=color_success, thumbnail=thumbnail_success)
+    await ctx.send(embed=embed_success)
+
 @culvert_cmd.subcommand(sub_cmd_name="download", sub_cmd_description="Downloads the latest culvert scores read by the bot sorted in alphabetical order by member.")
 async def download(ctx: SlashContext):
-    latest_data = collection_scores.find({}, {'name': 1, 'score': 1})
-    latest_scores = [{"name": doc["name"], "score": doc["score"][-1]} for doc in latest_data]
-    latest_scores_sorted = sorted(latest_scores, key=lambda x: x["name"])
-    df = pd.DataFrame(latest_scores_sorted)
+    latest_scores = await score_repository.latest_scores()
+    df = pd.DataFrame(latest_scores)
     csv_file_path = 'latest_scores.csv'
     df.to_csv(csv_file_path, index=False)
     await ctx.send(file=File(csv_file_path))
@@ -1454,19 +1432,10 @@ async def search_by_member(ctx: SlashContext, name: str):
     if ctx.channel.id not in allowed_channels:
         await ctx.send("This command isn't allowed in this channel. Try these channels instead: <#1163044373785759794>, <#1162981223526830122>, <#1166257483535355914>, <#1169561663553404938>, <#1171276796436680794>, <#1181487073262305291>", ephemeral=True)
         return -1
-    member = collection_scores.find_one({"name": name.lower()})
+    member = await score_repository.find_member(name)
     if member:
-        player_scores_data = collection_scores.find({}, {"name": 1, "class": 1, "level": 1, "score": 1, "date": 1})
-        player_scores_list = [{"name": doc["name"], "class": doc["class"], "level": doc["level"], "score": doc["score"], "date": doc["date"]} for doc in player_scores_data]
-        players_to_compare = []
-        for player in player_scores_list:
-            for logged_date in player["date"]:
-                if member["date"][-1] == logged_date:
-                    players_to_compare.append(player)
-                    continue
-        players_to_compare_sorted = sorted(players_to_compare, key=lambda x: x["score"][x["date"].index(member["date"][-1])], reverse=True)
-        member_rank = next(index for index, d in enumerate(players_to_compare_sorted) if d.get("name") == member["name"])
-        member_page = math.ceil((member_rank+1)/17)
+        member_rank, _ = await leaderboards.rank(member["name"], member["date"][-1])
+        member_page = math.ceil(member_rank/17)
         member_page_digits = [int(char) for char in str(member_page)]
         member_class = member["class"]
         numbers_dict = {
@@ -1482,12 +1451,13 @@ async def search_by_member(ctx: SlashContext, name: str):
             9: "9\uFE0F\u20E3"
         }
         emoji_string = ''.join(numbers_dict[digit] for digit in member_page_digits)
-        member_case_correction = collection_names.find_one({"name_lower": name.lower()})
+        await roster.load()
+        display_name = roster.display_name(name.lower())
         embeds_pages = []
-        title_shared = f'{member_case_correction["name"]}\'s Culvert Scores'
-        description_graph = f'{member_case_correction["name"]} is a Level {member["level"]} {member["class"].title()}. \n\n Their most recently logged culvert score was {"{:,}".format(member["score"][-1])}, which ranks them at #{member_rank+1} out of all logged scores on that day. This makes them a {emoji_string}-pager.'
+        title_shared = f'{display_name}\'s Culvert Scores'
+        description_graph = f'{display_name} is a Level {member["level"]} {member["class"].title()}. \n\n Their most recently logged culvert score was {"{:,}".format(member["score"][-1])}, which ranks them at #{member_rank} out of all logged scores on that day. This makes them a {emoji_string}-pager.'
         color_shared = '#2bff00'
-        thumbnail_shared = embed_thumbnails[member_class.lower()]
+        thumbnail_shared = embed_thumbnails[class_catalog.thumbnail_key(member_class)]
         footer_shared = f'Log date range: {datetime.strptime(member["date"][0], "%Y-%m-%d").strftime("%B %d, %Y")} to {datetime.strptime(member["date"][-1], "%Y-%m-%d").strftime("%B %d, %Y")}'
         embed_graph = create_embed(title_shared, description=description_graph, color=color_shared, thumbnail=thumbnail_shared, footer=footer_shared)
         embeds_pages.append(embed_graph)
@@ -1599,40 +1569,31 @@ async def search_by_date(ctx: SlashContext, date: str):
         await ctx.send(embed=embed_fail)
         return -1
         
-    player_scores_data = collection_scores.find({}, {"name": 1, "class": 1, "level": 1, "score": 1, "date": 1})
-    player_scores_list = [{"name": doc["name"], "class": doc["class"], "level": doc["level"], "score": doc["score"], "date": doc["date"]} for doc in player_scores_data]
-    players_to_display = []
-    
-    for member in player_scores_list:
-        for logged_date in member["date"]:
-            if date == logged_date:
-                players_to_display.append(member)
-                continue
-    if len(players_to_display) > 0:
-        players_to_display_sorted = sorted(players_to_display, key=lambda x: x["score"][x["date"].index(date)], reverse=True)
+    leaderboard = await leaderboards.get(date)
+    await roster.load()
+    if leaderboard:
+        players_to_display_sorted = leaderboard["entries"]
         names_field = ''
         class_field = ''
         scores_field = ''
-        total_score = 0
+        total_score = leaderboard["total"]
         embeds_pages = []
         title_data = f'Top Culvert Scores on {datetime.strptime(date, "%Y-%m-%d").strftime("%B %d, %Y")}'
         color_data = '#2bff00'
         thumbnail_data = embed_thumbnails["sugar_done"]
-        for index, member in enumerate(players_to_display_sorted):
-            total_score += member["score"][member["date"].index(date)]
         description_data = f'The total score on this date was: {"{:,}".format(total_score)}!'
         for index, member in enumerate(players_to_display_sorted):
-            member_case_correction = collection_names.find_one({"name_lower": member["name"].lower()})
+            display_name = roster.display_name(member["name"].lower())
             class_field += f'{member["class"].title()}\n'
-            scores_field += f'{"{:,}".format(member["score"][member["date"].index(date)])}\n'
+            scores_field += f'{"{:,}".format(member["score"])}\n'
             if index == 0:
-                names_field += f'{member_case_correction["name"]} \U0001F947\n'
+                names_field += f'{display_name} \U0001F947\n'
             elif index == 1:
-                names_field += f'{member_case_correction["name"]} \U0001F948\n'
+                names_field += f'{display_name} \U0001F948\n'
             elif index == 2:
-                names_field += f'{member_case_correction["name"]} \U0001F949\n'
+                names_field += f'{display_name} \U0001F949\n'
             else:
-                names_field += f'{member_case_correction["name"]}\n'
+                names_field += f'{display_name}\n'
 
             if (index+1) % 17 == 0:
                 fields_data = [
@@ -1703,73 +1664,33 @@ async def search_by_date(ctx: SlashContext, date: str):
     ]
 )
 async def search_class(ctx: SlashContext, class_name: str):
-    def expand_abbreviation(abbrev):
-        abbrev = abbrev.lower()
-        return abbreviation_map.get(abbrev, None)
     if ctx.channel.id not in allowed_channels:
         await ctx.send("This command isn't allowed in this channel. Try these channels instead: <#1163044373785759794>, <#1162981223526830122>, <#1166257483535355914>, <#1169561663553404938>, <#1171276796436680794>, <#1181487073262305291>", ephemeral=True)
         return -1
-    abbreviation_map = {
-        "drk": "dark knight",
-        "pally": "paladin",
-        "bish": "bishop",
-        "bishy": "bishop",
-        "fp": "arch mage (f/p)",
-        "il": "arch mage (i/l)",
-        "nl": "night lord",
-        "nightlord": "night lord",
-        "shad": "shadower",
-        "bm": "bowmaster",
-        "mm": "marksman",
-        "bucc": "buccaneer",
-        "dual blade": "blade master",
-        "db": "blade master",
-        "cm": "cannon master",
-        "pf": "pathfinder",
-        "bw": "blaze wizard",
-        "tb": "thunder breaker",
-        "dw": "dawn warrior",
-        "wa": "wind archer",
-        "nw": "night walker",
-        "mech": "mechanic",
-        "bam": "battle mage",
-        "ds": "demon slayer",
-        "da": "demon avenger",
-        "wh": "wild hunter",
-        "merc": "mercedes",
-        "lumi": "luminous",
-        "ab": "angelic buster",
-        "bt": "beast tamer",
-        "hoy": "hoyoung"
-    }
-    search_name = class_name.lower()
-    abbrev_name = expand_abbreviation(search_name)
-    if abbrev_name is not None:
-        search_name = abbrev_name
-    class_scores_data = collection_scores.find({"class": search_name}, {"name": 1, "class": 1, "level": 1, "score": 1, "date": 1})
-    class_scores_list = [{"name": doc["name"], "class": doc["class"], "level": doc["level"], "score": doc["score"], "date": doc["date"]} for doc in class_scores_data]
-    if class_scores_list:
+    search_name = class_catalog.expand(class_name)
+    class_scores_list_sorted = await score_repository.class_leaderboard(search_name)
+    await roster.load()
+    if class_scores_list_sorted:
         embeds_pages = []
-        class_scores_list_sorted = sorted(class_scores_list, key=lambda x: x["score"][-1], reverse=True)
         names_field = ''
         levels_field = ''
         scores_field = ''
         title_class = f"Top Culvert Scores for all {search_name.title()}s in the Guild"
-        description_class = f"These were scored on {datetime.strptime(class_scores_list[0]['date'][-1], '%Y-%m-%d').strftime('%B %d, %Y')}."
+        description_class = f"These were scored on {datetime.strptime(class_scores_list_sorted[0]['date'], '%Y-%m-%d').strftime('%B %d, %Y')}."
         color_class = "#2bff00"
-        thumbnail_class = embed_thumbnails[search_name]
+        thumbnail_class = embed_thumbnails[class_catalog.thumbnail_key(search_name)]
         for index, member in enumerate(class_scores_list_sorted):
-            member_case_correction = collection_names.find_one({"name_lower": member["name"].lower()})
+            display_name = roster.display_name(member["name"].lower())
             levels_field += f'{member["level"]}\n'
-            scores_field += f'{"{:,}".format(member["score"][-1])}\n'
+            scores_field += f'{"{:,}".format(member["score"])}\n'
             if index == 0:
-                names_field += f'{member_case_correction["name"]} \U0001F947\n'
+                names_field += f'{display_name} \U0001F947\n'
             elif index == 1:
-                names_field += f'{member_case_correction["name"]} \U0001F948\n'
+                names_field += f'{display_name} \U0001F948\n'
             elif index == 2:
-                names_field += f'{member_case_correction["name"]} \U0001F949\n'
+                names_field += f'{display_name} \U0001F949\n'
             else:
-                names_field += f'{member_case_correction["name"]}\n'
+                names_field += f'{display_name}\n'
 
             if (index+1) % 10 == 0:
                 fields_class = [
@@ -1834,15 +1755,9 @@ async def search_list(ctx: SlashContext):
     if ctx.channel.id not in allowed_channels:
         await ctx.send("This command isn't allowed in this channel. Try these channels instead: <#1163044373785759794>, <#1162981223526830122>, <#1166257483535355914>, <#1169561663553404938>, <#1171276796436680794>, <#1181487073262305291>", ephemeral=True)
         return -1
-    player_score_data = collection_scores.find({}, {"date": 1})
-    player_score_list = [{"date": doc["date"]} for doc in player_score_data]
     embed_pages = []
     dates_field = ''
-    dates = set()
-    for member in player_score_list:
-        for date in member["date"]:
-            dates.add(date)
-    dates = sorted(dates, reverse=True)
+    dates = sorted(await score_repository.list_dates(), reverse=True)
     title_list = "Dates Where Scores Were Logged"
     description_list = "These are organized from latest to earliest. This is a reference for using the `/saga date` command."
     color_list = "#2bff00"
@@ -1883,23 +1798,10 @@ async def search_guild(ctx: SlashContext):
     if ctx.channel.id not in allowed_channels:
         await ctx.send("This command isn't allowed in this channel. Try these channels instead: <#1163044373785759794>, <#1162981223526830122>, <#1166257483535355914>, <#1169561663553404938>, <#1171276796436680794>, <#1181487073262305291>", ephemeral=True)
         return -1
-    player_score_data = collection_scores.find({}, {"score": 1, "date": 1})
-    player_score_list = [{"score": doc["score"], "date": doc["date"]} for doc in player_score_data]
-    dates = set()
-    total_scores = []
+    guild_series = await guild_totals.series()
+    dates = [point["_id"] for point in guild_series]
+    total_scores = [point["total"] for point in guild_series]
     embed_pages = []
-    for member in player_score_list:
-        for date in member["date"]:
-            dates.add(date)
-    dates = sorted(dates)
-    score_on_date = 0
-    for date in dates:
-        for player in player_score_list:
-            for index, player_date in enumerate(player["date"]):
-                if date == player_date:
-                    score_on_date += player["score"][index]
-        total_scores.append(score_on_date)
-        score_on_date = 0
 
     title_guild = "Saga's Total Culvert Scores Over Time"
     description_guild = "The total score of our combined guild members per week. Raw numbers are on the next page."
@@ -1965,4 +1867,13 @@ async def search_guild(ctx: SlashContext):
     paginator.pages[0] = embed_graph
     await paginator.message.edit(embed=paginator.pages[0])
 
-bot.start(TOKEN)
\ No newline at end of file
+if __name__ == "__main__":
+    start_ocr_executor()
+    storage = open_storage(STORAGE_BACKEND, URI)
+    score_repository = AsyncProxy(storage.scores)
+    member_repository = AsyncProxy(storage.members)
+    alias_table = AsyncProxy(storage.aliases)
+    roster = RosterCache(member_repository)
+    guild_totals = AsyncProxy(storage.guild_totals)
+    leaderboards = AsyncProxy(storage.leaderboards)
+    bot.start(TOKEN)
@@ -0,0 +1,78 @@
+import csv
+import re
+import Levenshtein
+from functools import lru_cache
+
+CLASSES_CSV_PATH = 'maplestory_classes.csv'
+
+class_abbreviations = {
+    "drk": "dark knight",
+    "pally": "paladin",
+    "bish": "bishop",
+    "bishy": "bishop",
+    "fp": "arch mage (f/p)",
+    "il": "arch mage (i/l)",
+    "nl": "night lord",
+    "nightlord": "night lord",
+    "shad": "shadower",
+    "bm": "bowmaster",
+    "mm": "marksman",
+    "bucc": "buccaneer",
+    "dual blade": "blade master",
+    "db": "blade master",
+    "cm": "cannon master",
+    "pf": "pathfinder",
+    "bw": "blaze wizard",
+    "tb": "thunder breaker",
+    "dw": "dawn warrior",
+    "wa": "wind archer",
+    "nw": "night walker",
+    "mech": "mechanic",
+    "bam": "battle mage",
+    "ds": "demon slayer",
+    "da": "demon avenger",
+    "wh": "wild hunter",
+    "merc": "mercedes",
+    "lumi": "luminous",
+    "ab": "angelic buster",
+    "bt": "beast tamer",
+    "hoy": "hoyoung"
+}
+
+def normalize_class(class_name):
+    return re.sub(r"\s+", " ", class_name).strip().lower()
+
+class ClassCatalog:
+    def __init__(self, csv_path=CLASSES_CSV_PATH, abbreviations=class_abbreviations):
+        with open(csv_path, mode='r', encoding='utf-8-sig') as file:
+            self.names = [row[0] for row in csv.reader(file) if row]
+        self.lowered_names = [name.lower() for name in self.names]
+        self.normalized_names = [normalize_class(name) for name in self.names]
+        self.names_by_normalized = dict(zip(self.normalized_names, self.names))
+        self.abbreviations = abbreviations
+        self.nearest = lru_cache(maxsize=4096)(self.find_nearest)
+
+    def expand(self, class_name):
+        normalized = normalize_class(class_name)
+        return self.abbreviations.get(normalized, normalized)
+
+    def canonical(self, class_name):
+        return self.names_by_normalized.get(self.expand(class_name))
+
+    def thumbnail_key(self, class_name):
+        expanded = self.expand(class_name)
+        return expanded if expanded in self.names_by_normalized else None
+
+    def find_nearest(self, ocr_class):
+        top_class = ''
+        best_similarity = 0
+        ocr_class_lower = ocr_class.lower()
+        for name, name_lower in zip(self.names, self.lowered_names):
+            distance = Levenshtein.distance(ocr_class_lower, name_lower)
+            similarity = round(1-distance/max(len(ocr_class), len(name)), 5)
+            if similarity > best_similarity:
+                best_similarity = similarity
+                top_class = name
+        return top_class
+
+class_catalog = ClassCatalog()
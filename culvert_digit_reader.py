@@ -0,0 +1,119 @@
+import os
+import sys
+import json
+import cv2
+import numpy as np
+from pathlib import Path
+
+DIGIT_ATLAS_PATH = os.getenv('DIGIT_ATLAS_PATH', 'digit_atlas.npz')
+MIN_GLYPH_CONFIDENCE = float(os.getenv('MIN_GLYPH_CONFIDENCE', 0.85))
+GLYPH_SIZE = (12, 16)
+DIGIT_LABELS = "0123456789"
+
+def find_glyph_boxes(cell_image, min_area=4):
+    ink = (cell_image < 128).astype(np.uint8)
+    count, _, stats, _ = cv2.connectedComponentsWithStats(ink, connectivity=8)
+    boxes = stats[1:count, :4][stats[1:count, cv2.CC_STAT_AREA] >= min_area]
+    return boxes[np.argsort(boxes[:, 0])] if len(boxes) else boxes
+
+def normalize_glyphs(cell_image, boxes):
+    glyphs = np.empty((len(boxes), GLYPH_SIZE[0] * GLYPH_SIZE[1]), dtype=np.float32)
+    for index, (x, y, w, h) in enumerate(boxes):
+        glyph = cv2.resize(cell_image[y:y+h, x:x+w], GLYPH_SIZE, interpolation=cv2.INTER_AREA)
+        glyphs[index] = 255 - glyph.reshape(-1)
+    glyphs -= glyphs.mean(axis=1, keepdims=True)
+    norms = np.linalg.norm(glyphs, axis=1, keepdims=True)
+    return glyphs / np.where(norms == 0, 1, norms)
+
+def split_commas(boxes):
+    if not len(boxes):
+        return boxes
+    heights = boxes[:, 3]
+    is_digit = heights >= 0.6 * np.median(heights)
+    return boxes[is_digit]
+
+def load_digit_atlas(atlas_path=DIGIT_ATLAS_PATH):
+    if not os.path.exists(atlas_path):
+        return None
+    with np.load(atlas_path) as atlas:
+        return atlas["templates"].astype(np.float32)
+
+digit_atlas = None
+digit_atlas_loaded = False
+
+def get_digit_atlas():
+    global digit_atlas, digit_atlas_loaded
+    if not digit_atlas_loaded:
+        digit_atlas = load_digit_atlas()
+        digit_atlas_loaded = True
+    return digit_atlas
+
+def read_number(cell_image, templates):
+    boxes = split_commas(find_glyph_boxes(cell_image))
+    if not len(boxes):
+        return "", 1.0
+    correlations = normalize_glyphs(cell_image, boxes) @ templates.T
+    best = correlations.argmax(axis=1)
+    confidence = float(correlations[np.arange(len(best)), best].min())
+    return ''.join(DIGIT_LABELS[index] for index in best), confidence
+
+def read_numbers(cell_images):
+    templates = get_digit_atlas()
+    if templates is None:
+        return [None for _ in cell_images]
+    numbers = []
+    for cell_image in cell_images:
+        digits, confidence = read_number(cell_image, templates)
+        numbers.append(digits if confidence >= MIN_GLYPH_CONFIDENCE else None)
+    return numbers
+
+def learn_digit_atlas(samples, atlas_path=DIGIT_ATLAS_PATH):
+    sums = np.zeros((len(DIGIT_LABELS), GLYPH_SIZE[0] * GLYPH_SIZE[1]), dtype=np.float64)
+    counts = np.zeros(len(DIGIT_LABELS), dtype=np.int64)
+    for cell_image, digits in samples:
+        boxes = split_commas(find_glyph_boxes(cell_image))
+        if len(boxes) != len(digits):
+            continue
+        labels = np.array([DIGIT_LABELS.index(digit) for digit in digits])
+        np.add.at(sums, labels, normalize_glyphs(cell_image, boxes))
+        np.add.at(counts, labels, 1)
+    if not counts.all():
+        missing = [DIGIT_LABELS[index] for index in np.flatnonzero(counts == 0)]
+        print(f"Unable to learn digits {', '.join(missing)}: no clean samples.")
+        return None
+    templates = sums / counts[:, None]
+    templates -= templates.mean(axis=1, keepdims=True)
+    templates /= np.linalg.norm(templates, axis=1, keepdims=True)
+    np.savez(atlas_path, templates=templates.astype(np.float32), counts=counts)
+    print(f"Learned digit atlas from {counts.sum()} glyphs: {dict(zip(DIGIT_LABELS, counts.tolist()))}")
+    return templates
+
+def collect_corpus_samples(corpus_dir):
+    from culvert_processor import decode_image, preprocess_image, segment_rows, segment_columns, crop_cells, CELL_COLUMNS
+    samples = []
+    for truth_path in sorted(Path(corpus_dir).glob("*.json")):
+        image_path = next((path for path in truth_path.parent.glob(f"{truth_path.stem}.*") if path.suffix != ".json"), None)
+        if image_path is None:
+            continue
+        with open(truth_path, "r", encoding="utf-8") as file:
+            truth = json.load(file)
+        image = decode_image(image_path.read_bytes())
+        if image is None:
+            continue
+        final_image = preprocess_image(image)
+        ink = final_image < 128
+        row_bands = segment_rows(ink)
+        columns = dict(zip(CELL_COLUMNS, segment_columns(ink)))
+        if len(row_bands) != len(truth) or len(columns) != len(CELL_COLUMNS):
+            print(f"Skipping {image_path.name}: segmentation doesn't match ground truth.")
+            continue
+        for field in ("level", "score"):
+            for cell_image, true_row in zip(crop_cells(final_image, row_bands, columns[field]), truth):
+                samples.append((cell_image, str(true_row[field])))
+    return samples
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage: python culvert_digit_reader.py <corpus_dir>")
+        sys.exit(1)
+    sys.exit(0 if learn_digit_atlas(collect_corpus_samples(sys.argv[1])) is not None else 1)
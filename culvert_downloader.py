@@ -0,0 +1,49 @@
+import os
+import asyncio
+import aiohttp
+
+MAX_IMAGE_BYTES = int(os.getenv('MAX_IMAGE_BYTES', 10 * 1024 * 1024))
+DOWNLOAD_RETRIES = 3
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+DOWNLOAD_TIMEOUT = aiohttp.ClientTimeout(total=20, connect=5, sock_read=10)
+
+http_session = None
+
+def get_http_session():
+    global http_session
+    if http_session is None or http_session.closed:
+        connector = aiohttp.TCPConnector(limit=12, keepalive_timeout=60)
+        http_session = aiohttp.ClientSession(connector=connector, timeout=DOWNLOAD_TIMEOUT)
+    return http_session
+
+async def close_http_session():
+    global http_session
+    if http_session is not None and not http_session.closed:
+        await http_session.close()
+    http_session = None
+
+async def fetch_image(image_url):
+    session = get_http_session()
+    for attempt in range(1, DOWNLOAD_RETRIES + 1):
+        try:
+            async with session.get(image_url) as response:
+                if response.status == 200:
+                    if response.content_length and response.content_length > MAX_IMAGE_BYTES:
+                        print(f"Image too large ({response.content_length} bytes): {image_url}")
+                        return None
+                    image_bytes = bytearray()
+                    async for chunk in response.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                        image_bytes.extend(chunk)
+                        if len(image_bytes) > MAX_IMAGE_BYTES:
+                            print(f"Image too large (>{MAX_IMAGE_BYTES} bytes): {image_url}")
+                            return None
+                    return image_bytes
+                if response.status < 500 and response.status != 429:
+                    print(f"Unable to download image ({response.status}): {image_url}")
+                    return None
+                print(f"Download attempt {attempt} failed ({response.status}): {image_url}")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"Download attempt {attempt} failed ({e!r}): {image_url}")
+        if attempt < DOWNLOAD_RETRIES:
+            await asyncio.sleep(0.5 * 2 ** (attempt - 1))
+    return None
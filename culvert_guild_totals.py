@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+from pymongo import ReplaceOne, DeleteOne
+
+GUILD_TOTALS_COLLECTION = 'guild-totals'
+
+def summarize_scores(date, scores):
+    scores = np.asarray(scores, dtype=np.int64)
+    return {
+        "_id": date,
+        "total": int(scores.sum()),
+        "participants": len(scores),
+        "mean": float(scores.mean()),
+        "median": float(np.median(scores))
+    }
+
+class GuildTotalsSeries:
+    def __init__(self, collection, score_repository):
+        self.collection = collection
+        self.score_repository = score_repository
+        self.built = False
+
+    def ensure_built(self):
+        if not self.built:
+            if self.collection.count_documents({}, limit=1) == 0:
+                self.rebuild()
+            self.built = True
+
+    def update(self, scores_by_date):
+        self.ensure_built()
+        operations = [
+            ReplaceOne({"_id": date}, summarize_scores(date, scores), upsert=True) if scores else DeleteOne({"_id": date})
+            for date, scores in scores_by_date.items()
+        ]
+        if operations:
+            self.collection.bulk_write(operations, ordered=False)
+        return len(operations)
+
+    def remove_dates(self, start_date, end_date=None):
+        date_filter = start_date if end_date is None else {"$gte": start_date, "$lte": end_date}
+        return self.collection.delete_many({"_id": date_filter}).deleted_count
+
+    def rebuild(self):
+        dates, scores = self.score_repository.dates_and_scores()
+        totals = pd.DataFrame({"date": dates, "score": scores}).groupby("date")["score"].agg(["sum", "count", "mean", "median"])
+        self.collection.delete_many({})
+        if len(totals):
+            self.collection.insert_many([
+                {"_id": date, "total": int(row["sum"]), "participants": int(row["count"]), "mean": float(row["mean"]), "median": float(row["median"])}
+                for date, row in totals.iterrows()
+            ])
+        return len(totals)
+
+    def series(self):
+        self.ensure_built()
+        return list(self.collection.find().sort("_id", 1))
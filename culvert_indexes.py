@@ -0,0 +1,75 @@
+import os
+from datetime import datetime, timedelta, timezone
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure
+from culvert_repository import ARRAY_COLLECTION, ROWS_COLLECTION
+
+NAMES_COLLECTION = 'player-names'
+INDEX_USAGE_MIN_DAYS = float(os.getenv('INDEX_USAGE_MIN_DAYS', 7))
+INDEX_SPECS = {
+    NAMES_COLLECTION: [
+        ([("name_lower", ASCENDING)], {"unique": True}),
+        ([("discord_id", ASCENDING)], {})
+    ],
+    ARRAY_COLLECTION: [
+        ([("name", ASCENDING)], {}),
+        ([("date", ASCENDING)], {}),
+        ([("class", ASCENDING)], {})
+    ],
+    ROWS_COLLECTION: [
+        ([("date", ASCENDING), ("score", DESCENDING)], {}),
+        ([("name", ASCENDING), ("date", ASCENDING)], {"unique": True}),
+        ([("class", ASCENDING), ("name", ASCENDING), ("date", ASCENDING)], {})
+    ]
+}
+
+def index_name(keys):
+    return "_".join(f"{field}_{direction}" for field, direction in keys)
+
+def ensure_indexes(db, collections=None):
+    created = []
+    for collection_name, specs in INDEX_SPECS.items():
+        if collections is not None and collection_name not in collections:
+            continue
+        for keys, options in specs:
+            try:
+                created.append(f"{collection_name}.{db[collection_name].create_index(keys, name=index_name(keys), **options)}")
+            except OperationFailure as e:
+                print(f"Unable to create index {index_name(keys)} on {collection_name}: {e}")
+    return created
+
+def find_missing_indexes(db, collections=None):
+    missing = []
+    for collection_name, specs in INDEX_SPECS.items():
+        if collections is not None and collection_name not in collections:
+            continue
+        existing_keys = [[tuple(key) for key in info["key"]] for info in db[collection_name].index_information().values()]
+        for keys, _ in specs:
+            if keys not in existing_keys:
+                missing.append(f"{collection_name}.{index_name(keys)}")
+    return missing
+
+def find_unused_indexes(db, collections=None, min_days=INDEX_USAGE_MIN_DAYS):
+    unused = []
+    observed_before = datetime.now(timezone.utc) - timedelta(days=min_days)
+    for collection_name in collections or INDEX_SPECS:
+        for stats in db[collection_name].aggregate([{"$indexStats": {}}]):
+            since = stats["accesses"]["since"]
+            if since.tzinfo is None:
+                since = since.replace(tzinfo=timezone.utc)
+            if stats["name"] != "_id_" and stats["accesses"]["ops"] == 0 and since <= observed_before:
+                unused.append(f"{collection_name}.{stats['name']} (since {since:%Y-%m-%d %H:%M})")
+    return unused
+
+def report_indexes(db, collections=None):
+    missing = find_missing_indexes(db, collections)
+    if missing:
+        print(f"Missing indexes: {', '.join(missing)}")
+    try:
+        unused = find_unused_indexes(db, collections)
+    except OperationFailure as e:
+        print(f"Unable to read index usage: {e}")
+        return missing, None
+    if unused:
+        print(f"Unused indexes: {', '.join(unused)}")
+    return missing, unused
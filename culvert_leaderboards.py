@@ -0,0 +1,60 @@
+from datetime import datetime, timezone
+from pymongo import ReplaceOne, DeleteOne
+
+LEADERBOARDS_COLLECTION = 'date-leaderboards'
+
+def build_leaderboard(date, scores):
+    entries = [
+        {"rank": rank, "name": score["name"], "class": score["class"], "level": score["level"], "score": score["score"]}
+        for rank, score in enumerate(scores, start=1)
+    ]
+    return {
+        "_id": date,
+        "entries": entries,
+        "total": sum(entry["score"] for entry in entries),
+        "participants": len(entries),
+        "updated_at": datetime.now(timezone.utc)
+    }
+
+class LeaderboardStore:
+    def __init__(self, collection, score_repository, guild_totals=None):
+        self.collection = collection
+        self.score_repository = score_repository
+        self.guild_totals = guild_totals
+
+    def refresh(self, dates):
+        operations = []
+        written = 0
+        scores_by_date = {}
+        for date in set(dates):
+            scores = self.score_repository.scores_on_date(date)
+            scores_by_date[date] = [score["score"] for score in scores]
+            if scores:
+                operations.append(ReplaceOne({"_id": date}, build_leaderboard(date, scores), upsert=True))
+                written += 1
+            else:
+                operations.append(DeleteOne({"_id": date}))
+        if operations:
+            self.collection.bulk_write(operations, ordered=False)
+        if self.guild_totals is not None:
+            self.guild_totals.update(scores_by_date)
+        return written
+
+    def remove_dates(self, start_date, end_date=None):
+        date_filter = start_date if end_date is None else {"$gte": start_date, "$lte": end_date}
+        if self.guild_totals is not None:
+            self.guild_totals.remove_dates(start_date, end_date)
+        return self.collection.delete_many({"_id": date_filter}).deleted_count
+
+    def get(self, date):
+        leaderboard = self.collection.find_one({"_id": date})
+        if leaderboard is None and self.refresh([date]):
+            leaderboard = self.collection.find_one({"_id": date})
+        return leaderboard
+
+    def rank(self, name, date):
+        leaderboard = self.get(date)
+        if leaderboard is None:
+            return None, None
+        rank = next((entry["rank"] for entry in leaderboard["entries"] if entry["name"] == name.lower()), None)
+        return rank, leaderboard
@@ -0,0 +1,31 @@
+from pymongo import UpdateOne
+
+class MemberRepository:
+    def __init__(self, collection):
+        self.collection = collection
+
+    def find(self, name):
+        return self.collection.find_one({"name_lower": name.lower()}, {"_id": 0})
+
+    def find_all(self):
+        return list(self.collection.find({}, {"_id": 0}).sort("name", 1))
+
+    def latest(self):
+        return self.collection.find_one({}, {"_id": 0}, sort=[("_id", -1)])
+
+    def count(self):
+        return self.collection.count_documents({})
+
+    def add(self, member):
+        self.collection.insert_one(dict(member))
+
+    def update(self, name, member):
+        return self.collection.update_one({"name_lower": name.lower()}, {"$set": member}).matched_count > 0
+
+    def remove(self, name):
+        return self.collection.delete_one({"name_lower": name.lower()}).deleted_count > 0
+
+    def reset_discord_ids(self, discord_ids):
+        if not discord_ids:
+            return 0
+        return self.collection.bulk_write([UpdateOne({"discord_id": discord_id}, {"$set": {"discord_id": 0}}) for discord_id in discord_ids]).modified_count
@@ -1,40 +1,98 @@
-import Levenshtein
 import re
 import numpy as np
-from Levenshtein import ratio
+from rapidfuzz.process import cdist
+from rapidfuzz.distance import Indel
+from scipy.optimize import linear_sum_assignment
+from culvert_class_catalog import normalize_class
 
-def class_similarity(str1, str2):
-    distance = Levenshtein.distance(str1.lower(), str2.lower())
-    longest_length = max(len(str1), len(str2))
-    return round(1-distance/longest_length, 5)
+def normalize_name(name):
+    return re.sub(r"\s+", "", name).lower()
 
-def find_max_sim(sim_list, index_ignore):
-    sim = -1
-    sim_index = -1
-    for index, value in enumerate(sim_list):
-        if index in index_ignore:
+def group_by_class(classes):
+    groups = {}
+    for index, class_name in enumerate(classes):
+        groups.setdefault(class_name, []).append(index)
+    return groups
+
+def similarity_blocks(ocr_names, defined_names):
+    ocr_normalized = [normalize_name(ocr[0]) for ocr in ocr_names]
+    defined_normalized = [normalize_name(defined["name"]) for defined in defined_names]
+    ocr_groups = group_by_class([normalize_class(ocr[1]) for ocr in ocr_names])
+    defined_groups = group_by_class([normalize_class(defined["class"]) for defined in defined_names])
+    blocks = []
+    for class_name, defined_indices in defined_groups.items():
+        ocr_indices = ocr_groups.get(class_name)
+        if not ocr_indices:
             continue
-        if value > sim:
-            sim = value
-            sim_index = index
-    return sim, sim_index
+        matrix = cdist(
+            [defined_normalized[index] for index in defined_indices],
+            [ocr_normalized[index] for index in ocr_indices],
+            scorer=Indel.normalized_similarity,
+            dtype=np.float64,
+            workers=-1
+        )
+        blocks.append((np.array(defined_indices), np.array(ocr_indices), matrix))
+    return blocks
 
 def link_names(ocr_names, defined_names):
-    similarity_matrix = [[0 for _ in range(len(ocr_names))] for _ in range(len(defined_names))]
-    for row, defined in enumerate(defined_names):
-        for column, ocr in enumerate(ocr_names):
-            defined_class_normalized = defined["class"].lower()
-            ocr_class_normalized = ocr[1].lower()
-            similarity = 0
-            if ocr_class_normalized == defined_class_normalized:
-                defined_normalized = re.sub(r"\s", "", defined["name"]).lower()
-                ocr_normalized = re.sub(r"\s+", "", ocr[0]).lower()
-                similarity = ratio(ocr_normalized, defined_normalized)
-            similarity_matrix[row][column] = similarity
-    linked_columns = []
+    blocks = {}
+    for defined_indices, ocr_indices, matrix in similarity_blocks(ocr_names, defined_names):
+        for row, defined_index in enumerate(defined_indices):
+            blocks[int(defined_index)] = (ocr_indices, matrix[row])
+    linked_columns = np.zeros(len(ocr_names), dtype=bool)
+    first_unlinked = 0
     linked_names = []
-    for defined_index, row in enumerate(similarity_matrix):
-        similarity_score, highest_similarity_index = find_max_sim(row, linked_columns)
-        linked_columns.append(highest_similarity_index)
-        linked_names.append([similarity_score, defined_names[defined_index]["name"], ocr_names[highest_similarity_index]])
-    return linked_names
\ No newline at end of file
+    for defined_index, defined in enumerate(defined_names):
+        similarity_score, highest_similarity_index = -1, -1
+        if defined_index in blocks:
+            ocr_indices, similarities = blocks[defined_index]
+            similarities = np.where(linked_columns[ocr_indices], -1, similarities)
+            best = int(similarities.argmax())
+            if similarities[best] > 0:
+                similarity_score, highest_similarity_index = float(similarities[best]), int(ocr_indices[best])
+        if highest_similarity_index == -1:
+            while first_unlinked < len(ocr_names) and linked_columns[first_unlinked]:
+                first_unlinked += 1
+            if first_unlinked < len(ocr_names):
+                similarity_score, highest_similarity_index = 0, first_unlinked
+        if highest_similarity_index != -1:
+            linked_columns[highest_similarity_index] = True
+        linked_names.append([similarity_score, defined["name"], ocr_names[highest_similarity_index]])
+    return linked_names
+
+def alias_key(ocr_name, ocr_class):
+    return f"{normalize_name(ocr_name)}|{normalize_class(ocr_class)}"
+
+def link_aliases(ocr_names, defined_names, aliases):
+    defined_by_name = {defined["name"].lower(): index for index, defined in enumerate(defined_names)}
+    defined_by_normalized = {normalize_name(defined["name"]): index for index, defined in enumerate(defined_names)}
+    links = {}
+    for ocr_index, ocr in enumerate(ocr_names):
+        defined_index = defined_by_name.get(aliases.get(alias_key(ocr[0], ocr[1])))
+        if defined_index is None or defined_index in links:
+            continue
+        if defined_by_normalized.get(normalize_name(ocr[0]), defined_index) != defined_index:
+            continue
+        links[defined_index] = (1.0, ocr_index)
+    return links
+
+def link_names_optimal(ocr_names, defined_names, min_similarity=0.0, aliases=None):
+    links = link_aliases(ocr_names, defined_names, aliases) if aliases else {}
+    linked_ocr = {ocr_index for _, ocr_index in links.values()}
+    residue_defined = [index for index in range(len(defined_names)) if index not in links]
+    residue_ocr = [index for index in range(len(ocr_names)) if index not in linked_ocr]
+    blocks = similarity_blocks([ocr_names[index] for index in residue_ocr], [defined_names[index] for index in residue_defined])
+    for defined_indices, ocr_indices, matrix in blocks:
+        rows, columns = linear_sum_assignment(matrix, maximize=True)
+        for row, column in zip(rows, columns):
+            similarity = float(matrix[row, column])
+            if similarity > 0 and similarity >= min_similarity:
+                links[residue_defined[defined_indices[row]]] = (similarity, residue_ocr[ocr_indices[column]])
+    linked_names = [
+        [similarity, defined_names[defined_index]["name"], ocr_names[ocr_index]]
+        for defined_index, (similarity, ocr_index) in sorted(links.items())
+    ]
+    linked_ocr = {ocr_index for _, ocr_index in links.values()}
+    unmatched_defined = [defined for index, defined in enumerate(defined_names) if index not in links]
+    unmatched_ocr = [ocr for index, ocr in enumerate(ocr_names) if index not in linked_ocr]
+    return linked_names, unmatched_defined, unmatched_ocr
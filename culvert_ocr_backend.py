@@ -0,0 +1,108 @@
+import os
+import shlex
+import pytesseract
+from PIL import Image
+
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
+OCR_BACKEND = os.getenv('OCR_BACKEND', 'auto')
+DATA_KEYS = ("block_num", "par_num", "line_num", "word_num", "left", "top", "width", "height", "conf", "text")
+
+def parse_tesseract_config(config):
+    psm = 3
+    variables = {}
+    args = shlex.split(config)
+    index = 0
+    while index < len(args):
+        if args[index] == "--psm":
+            psm = int(args[index+1])
+            index += 1
+        elif args[index] == "-c":
+            name, value = args[index+1].split("=", 1)
+            variables[name] = value
+            index += 1
+        index += 1
+    return psm, variables
+
+class SubprocessOCRBackend:
+    name = "subprocess"
+
+    def image_to_string(self, image, config):
+        return pytesseract.image_to_string(image, config=config)
+
+    def image_to_data(self, image, config):
+        return pytesseract.image_to_data(image, config=config, output_type=pytesseract.Output.DICT)
+
+class TesserocrOCRBackend:
+    name = "tesserocr"
+
+    def __init__(self, lang="eng"):
+        self.api = tesserocr.PyTessBaseAPI(lang=lang, oem=tesserocr.OEM.DEFAULT)
+        self.variables = set()
+
+    def configure(self, config):
+        psm, variables = parse_tesseract_config(config)
+        self.api.SetPageSegMode(psm)
+        for name in self.variables - set(variables):
+            self.api.SetVariable(name, "")
+        for name, value in variables.items():
+            self.api.SetVariable(name, value)
+        self.variables = set(variables)
+
+    def set_image(self, image, config):
+        self.configure(config)
+        self.api.SetImage(Image.fromarray(image))
+
+    def image_to_string(self, image, config):
+        self.set_image(image, config)
+        return self.api.GetUTF8Text()
+
+    def image_to_data(self, image, config):
+        self.set_image(image, config)
+        self.api.Recognize()
+        data = {key: [] for key in DATA_KEYS}
+        block_num, par_num, line_num, word_num = 0, 0, 0, 0
+        level = tesserocr.RIL.WORD
+        for result in tesserocr.iterate_level(self.api.GetIterator(), level):
+            if result.Empty(level):
+                continue
+            if result.IsAtBeginningOf(tesserocr.RIL.BLOCK):
+                block_num, par_num, line_num = block_num + 1, 0, 0
+            if result.IsAtBeginningOf(tesserocr.RIL.PARA):
+                par_num, line_num = par_num + 1, 0
+            if result.IsAtBeginningOf(tesserocr.RIL.TEXTLINE):
+                line_num, word_num = line_num + 1, 0
+            word_num += 1
+            x1, y1, x2, y2 = result.BoundingBox(level)
+            data["block_num"].append(block_num)
+            data["par_num"].append(par_num)
+            data["line_num"].append(line_num)
+            data["word_num"].append(word_num)
+            data["left"].append(x1)
+            data["top"].append(y1)
+            data["width"].append(x2 - x1)
+            data["height"].append(y2 - y1)
+            data["conf"].append(result.Confidence(level))
+            data["text"].append(result.GetUTF8Text(level))
+        return data
+
+def create_ocr_backend(name=OCR_BACKEND):
+    if name in ("auto", "tesserocr") and tesserocr is not None:
+        try:
+            return TesserocrOCRBackend()
+        except RuntimeError as e:
+            print(f"Unable to start tesserocr, falling back to subprocess tesseract: {e}")
+    elif name == "tesserocr":
+        print("tesserocr is not installed, falling back to subprocess tesseract.")
+    return SubprocessOCRBackend()
+
+ocr_backend = None
+
+def get_ocr_backend():
+    global ocr_backend
+    if ocr_backend is None:
+        ocr_backend = create_ocr_backend()
+    return ocr_backend
@@ -0,0 +1,58 @@
+import os
+import json
+import hashlib
+from collections import OrderedDict
+
+class OCRCache:
+    def __init__(self, max_entries=256, path=None):
+        self.max_entries = max_entries
+        self.path = path
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        if self.path:
+            self.load()
+
+    @staticmethod
+    def key(image_bytes, *parts):
+        digest = hashlib.blake2b(image_bytes, digest_size=20)
+        for part in parts:
+            digest.update(f"|{part}".encode())
+        return digest.hexdigest()
+
+    def get(self, key):
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+        self.misses += 1
+        return None
+
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self.entries)}
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r") as file:
+                stored = json.load(file)
+        except (OSError, ValueError) as e:
+            print(f"Unable to load OCR cache: {e}")
+            return
+        for key, value in stored[-self.max_entries:]:
+            self.entries[key] = value
+
+    def save(self):
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(list(self.entries.items()), file)
+        os.replace(tmp_path, self.path)
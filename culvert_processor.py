@@ -1,104 +1,302 @@
+import os
 import cv2
-import csv
-import pytesseract
 import re
-import requests
+import time
 import unicodedata
 import datetime
 import numpy as np
-from culvert_name_matcher import class_similarity
+from culvert_class_catalog import class_catalog
+from culvert_ocr_backend import get_ocr_backend
+from culvert_digit_reader import read_numbers
 from datetime import datetime
+from contextlib import contextmanager
 
-def get_culvert_scores(image_url):
-    def remove_accents(input_str):
-        nfkd_form = unicodedata.normalize('NFKD', input_str)
-        return "".join([c for c in nfkd_form if not unicodedata.combining(c)])
-    
-    def check_zeros(input_str):
-        elements = input_str.split()
-        if not elements[-1].isdigit() and len(elements[-1]) <= 3:
-            elements[-1] = '0'
-        return ' '.join(elements)
-    
-    def get_maplestory_classes(csv_path):
-        classes = [] 
-        with open(csv_path, mode='r', encoding='utf-8-sig') as file:
-            csv_reader = csv.reader(file)
-            for row in csv_reader:
-                classes.append(row)
-        return classes
-    
-    def check_class_similarity(maple_class, classes_list):
-        top_class = ''
-        best_similarity = 0
-        for item in classes_list:
-            if class_similarity(maple_class, item) > best_similarity:
-                best_similarity = class_similarity(maple_class, item)
-                top_class = item
-        return top_class
-    
-    def replace_func(match):
-        char = match.group(0)
-        return known_ocr_mistakes.get(char, char)
-    
-    known_ocr_mistakes = {
-        "§": "5",
-        "Q": "0",
-        "O": "0"
-    }
-
-    classes = [item[0] for item in get_maplestory_classes('maplestory_classes.csv')]
+def get_log_date():
+    now_utc = datetime.utcnow()
+    return f"{now_utc.year:04d}-{now_utc.month:02d}-{now_utc.day:02d}"
 
-    # image_path = 'pg6.png'
-    # image = cv2.imread(image_path)
+def stamp_log_date(culvert_scores):
+    log_date = get_log_date()
+    return [entry[:4] + [log_date] for entry in culvert_scores]
+
+def remove_accents(input_str):
+    nfkd_form = unicodedata.normalize('NFKD', input_str)
+    return "".join([c for c in nfkd_form if not unicodedata.combining(c)])
+
+def check_zeros(input_str):
+    elements = input_str.split()
+    if not elements[-1].isdigit() and len(elements[-1]) <= 3:
+        elements[-1] = '0'
+    return ' '.join(elements)
+
+def replace_func(match):
+    char = match.group(0)
+    return known_ocr_mistakes.get(char, char)
 
-    response = requests.get(image_url)
-    if response.status_code == 200:
-        image_as_np_array = np.frombuffer(response.content, dtype=np.uint8)
-        image = cv2.imdecode(image_as_np_array, cv2.IMREAD_COLOR)
+known_ocr_mistakes = {
+    "§": "5",
+    "Q": "0",
+    "O": "0"
+}
 
-    (h, w) = image.shape[:2]
+LINE_PATTERN = re.compile(r'^(.+?)(\d{3})\s+(.*?)\s+((\d{1,3}(?:[,\s]\d{3})*)(?:\.\d+)?|([A-Za-z\d]{2}))$')
+LOW_CONFIDENCE = float(os.getenv('OCR_LOW_CONFIDENCE', 60))
+MAX_LOW_CONFIDENCE_REREADS = int(os.getenv('OCR_MAX_LOW_CONFIDENCE_REREADS', 4))
+FULL_CONFIG = r'--oem 3 --psm 6'
+LINE_CONFIG = r'--oem 3 --psm 7'
+
+OCR_MODES = ("full", "cells")
+CELL_COLUMNS = ("name", "class", "level", "mission", "score")
+NUMERIC_COLUMNS = ("level", "score")
+CELL_CONFIGS = {
+    "name": r'--oem 3 --psm 6',
+    "class": r'--oem 3 --psm 6 -c tessedit_char_whitelist=ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz()/',
+    "level": r'--oem 3 --psm 6 -c tessedit_char_whitelist=0123456789',
+    "score": r'--oem 3 --psm 6 -c tessedit_char_whitelist=0123456789,'
+}
+
+@contextmanager
+def timed(timings, stage):
+    if timings is None:
+        yield
+        return
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = timings.get(stage, 0) + time.perf_counter() - start_time
+
+def decode_image(image_bytes):
+    image_as_np_array = np.frombuffer(image_bytes, dtype=np.uint8)
+    return cv2.imdecode(image_as_np_array, cv2.IMREAD_COLOR)
+
+def resize_gray(image):
     resized_image = cv2.resize(image, (1700, 1500))
-    gray_image = cv2.cvtColor(resized_image, cv2.COLOR_BGR2GRAY)
+    return cv2.cvtColor(resized_image, cv2.COLOR_BGR2GRAY)
+
+def binarize(gray_image):
     _, binary_inv_thresh = cv2.threshold(gray_image, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
     kernel = np.ones((2,2), np.uint8)
     blurred_image = cv2.GaussianBlur(binary_inv_thresh, (9, 9), 2)
     dilated_image = cv2.dilate(blurred_image, kernel, iterations=1)
     final_image = cv2.bitwise_not(dilated_image)
     # cv2.imwrite('preprocessed.png', final_image)
+    return final_image
 
-    tesseract_custom_config = r'--oem 3 --psm 6'
-    lines = pytesseract.image_to_string(final_image, config=tesseract_custom_config).split('\n')
-    filtered_lines = [line for line in lines if line.strip()]
-    names_list = [f"{remove_accents(item.split()[0])}" for item in filtered_lines if len(item) > 1]
-    entry_data = [' '.join(item.split()[1:]) for item in filtered_lines if len(item) > 1]
-
-    class_level_list= []
-    score_list = []
-    for item in entry_data:
-        item = check_zeros(re.sub(r"[§QO]", replace_func, item))
-        match = re.search(r'^(.+?)(\d{3})\s+(.*?)\s+((\d{1,3}(?:[,\s]\d{3})*)(?:\.\d+)?|([A-Za-z\d]{2}))$', item)
-        if match:
-            class_processed = check_class_similarity(match.group(1), classes)
-            class_level_list.append([class_processed, int(match.group(2))])
-            score_list.append(int(re.sub(r'[,. ]', '', match.group(4))))
-    
-    now_utc = datetime.utcnow()
-    year = now_utc.year
-    month = now_utc.month
-    day = now_utc.day
-    
-    processed_list = [
-        [name] + class_level + [score] + [f"{year:04d}-{month:02d}-{day:02d}"]
-        for name, class_level, score in zip(names_list, class_level_list, score_list)
-    ]
-
-    for index, item in enumerate(filtered_lines):
-        print(f"{index}: {item}")
-    for index, item in enumerate(processed_list):
-        print(f"{index}: {item}")
+def preprocess_image(image):
+    return binarize(resize_gray(image))
+
+def scale_otsu(crop, scale=2):
+    scaled = cv2.resize(crop, None, fx=scale, fy=scale, interpolation=cv2.INTER_CUBIC)
+    _, thresh = cv2.threshold(scaled, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    return thresh
+
+def scale_adaptive(crop, scale=2):
+    scaled = cv2.resize(crop, None, fx=scale, fy=scale, interpolation=cv2.INTER_CUBIC)
+    return cv2.adaptiveThreshold(scaled, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 31, 10)
+
+def scale_binarize(crop, scale=1.5):
+    return binarize(cv2.resize(crop, None, fx=scale, fy=scale, interpolation=cv2.INTER_CUBIC))
+
+LINE_VARIANTS = (scale_otsu, scale_adaptive, scale_binarize)
+
+def find_runs(mask):
+    padded = np.concatenate(([False], mask, [False])).astype(np.int8)
+    edges = np.flatnonzero(np.diff(padded))
+    return list(zip(edges[::2], edges[1::2]))
+
+def segment_rows(ink, min_height=8, max_gap=3):
+    rows = []
+    for start, end in find_runs(ink.any(axis=1)):
+        if rows and start - rows[-1][1] <= max_gap:
+            rows[-1] = (rows[-1][0], end)
+        else:
+            rows.append((start, end))
+    return [(start, end) for start, end in rows if end - start >= min_height]
+
+def segment_columns(ink, column_count=len(CELL_COLUMNS), min_gap=12):
+    runs = find_runs(ink.any(axis=0))
+    if not runs:
+        return []
+    gaps = [(runs[i+1][0] - runs[i][1], runs[i][1], runs[i+1][0]) for i in range(len(runs) - 1)]
+    gaps = [gap for gap in gaps if gap[0] >= min_gap]
+    if len(gaps) < column_count - 1:
+        return []
+    boundaries = sorted(sorted(gaps, reverse=True)[:column_count - 1], key=lambda gap: gap[1])
+    columns = []
+    column_start = runs[0][0]
+    for _, gap_start, gap_end in boundaries:
+        columns.append((column_start, gap_start))
+        column_start = gap_end
+    columns.append((column_start, runs[-1][1]))
+    return columns
+
+def crop_cells(final_image, row_bands, column, padding=2):
+    (h, w) = final_image.shape[:2]
+    x0, x1 = max(column[0] - padding, 0), min(column[1] + padding, w)
+    return [final_image[max(top - padding, 0):min(bottom + padding, h), x0:x1] for top, bottom in row_bands]
+
+def ocr_column_cells(final_image, row_bands, column, config, padding=4):
+    (h, w) = final_image.shape[:2]
+    x0, x1 = max(column[0] - padding, 0), min(column[1] + padding, w)
+    column_image = final_image[:, x0:x1]
+    data = get_ocr_backend().image_to_data(column_image, config)
+    row_centers = np.array([(start + end) / 2 for start, end in row_bands])
+    cells = [[] for _ in row_bands]
+    for text, top, height in zip(data["text"], data["top"], data["height"]):
+        if not text.strip():
+            continue
+        row_index = int(np.abs(row_centers - (top + height / 2)).argmin())
+        cells[row_index].append(text.strip())
+    return [' '.join(cell) for cell in cells]
 
-    if len(filtered_lines) != len(processed_list):
+def match_classes(processed_list, timings=None):
+    with timed(timings, "class_match"):
+        for entry in processed_list:
+            entry[1] = class_catalog.nearest(entry[1])
+    return processed_list
+
+def group_lines(data):
+    lines = {}
+    for text, conf, top, height, block_num, par_num, line_num in zip(data["text"], data["conf"], data["top"], data["height"], data["block_num"], data["par_num"], data["line_num"]):
+        if not str(text).strip():
+            continue
+        line = lines.setdefault((block_num, par_num, line_num), {"words": [], "conf": 100.0, "number_conf": 100.0, "top": top, "bottom": top + height})
+        if line["words"] and any(char.isdigit() for char in str(text)):
+            line["number_conf"] = min(line["number_conf"], float(conf))
+        line["words"].append(str(text).strip())
+        line["conf"] = min(line["conf"], float(conf))
+        line["top"] = min(line["top"], top)
+        line["bottom"] = max(line["bottom"], top + height)
+    return [{"text": ' '.join(line["words"]), "conf": line["conf"], "number_conf": line["number_conf"], "top": line["top"], "bottom": line["bottom"]} for line in lines.values()]
+
+def parse_line(line):
+    elements = line.split()
+    if len(line) <= 1 or len(elements) < 2:
+        return None
+    item = check_zeros(re.sub(r"[§QO]", replace_func, ' '.join(elements[1:])))
+    match = LINE_PATTERN.search(item)
+    if not match:
+        return None
+    return [remove_accents(elements[0]), match.group(1), int(match.group(2)), int(re.sub(r'[,. ]', '', match.group(4)))]
+
+def reocr_line(gray_image, top, bottom, padding=6):
+    crop = gray_image[max(top - padding, 0):bottom + padding, :]
+    best = None
+    for variant in LINE_VARIANTS:
+        lines = group_lines(get_ocr_backend().image_to_data(variant(crop), LINE_CONFIG))
+        if not lines:
+            continue
+        text = ' '.join(line["text"] for line in lines)
+        conf = min(line["conf"] for line in lines)
+        parsed = parse_line(text)
+        if parsed is None:
+            continue
+        if conf >= LOW_CONFIDENCE:
+            return parsed, conf
+        if best is None or conf > best[1]:
+            best = (parsed, conf)
+    return best
+
+def count_reread(timings):
+    if timings is not None:
+        timings["reocr_lines"] = timings.get("reocr_lines", 0) + 1
+
+def read_lines_full(gray_image, final_image, timings=None):
+    with timed(timings, "tesseract"):
+        lines = group_lines(get_ocr_backend().image_to_data(final_image, FULL_CONFIG))
+
+    with timed(timings, "parsing"):
+        processed_list = [parse_line(line["text"]) for line in lines]
+
+    for index, line in enumerate(lines):
+        print(f"{index}: {line['text']} ({line['conf']:.0f})")
+
+    with timed(timings, "reocr"):
+        low_confidence_rereads = 0
+        for index, line in enumerate(lines):
+            if processed_list[index] is not None:
+                if line["number_conf"] >= LOW_CONFIDENCE or low_confidence_rereads >= MAX_LOW_CONFIDENCE_REREADS:
+                    continue
+                low_confidence_rereads += 1
+            count_reread(timings)
+            candidate = reocr_line(gray_image, line["top"], line["bottom"])
+            if candidate and (processed_list[index] is None or candidate[1] > line["conf"]):
+                print(f"{index}: re-read as {candidate[0]} ({candidate[1]:.0f})")
+                processed_list[index] = candidate[0]
+
+    if not processed_list or None in processed_list:
+        return False
+    return match_classes(processed_list, timings)
+
+def read_rows_cells(gray_image, final_image, timings=None):
+    with timed(timings, "segmentation"):
+        ink = final_image < 128
+        row_bands = segment_rows(ink)
+        columns = segment_columns(ink)
+    if not row_bands or not columns:
+        return False
+    columns = dict(zip(CELL_COLUMNS, columns))
+    with timed(timings, "digits"):
+        numbers = {column_name: read_numbers(crop_cells(final_image, row_bands, columns[column_name])) for column_name in NUMERIC_COLUMNS}
+    with timed(timings, "tesseract"):
+        cells = {}
+        for column_name, column in columns.items():
+            if column_name not in CELL_CONFIGS:
+                continue
+            if column_name in numbers and None not in numbers[column_name]:
+                cells[column_name] = numbers[column_name]
+                continue
+            cells[column_name] = ocr_column_cells(final_image, row_bands, column, CELL_CONFIGS[column_name])
+            if column_name in numbers:
+                cells[column_name] = [cell if number is None else number for number, cell in zip(numbers[column_name], cells[column_name])]
+
+    with timed(timings, "parsing"):
+        processed_list = []
+        for index, (name, maple_class, level, score) in enumerate(zip(cells["name"], cells["class"], cells["level"], cells["score"])):
+            print(f"{index}: {name} | {maple_class} | {level} | {score}")
+            level_digits = re.sub(r'\D', '', level)
+            score_digits = re.sub(r'\D', '', score)
+            if not name or not maple_class or len(level_digits) != 3:
+                processed_list.append(None)
+                continue
+            processed_list.append([remove_accents(name.split()[0]), maple_class, int(level_digits), int(score_digits) if score_digits else 0])
+
+    with timed(timings, "reocr"):
+        for index, (top, bottom) in enumerate(row_bands):
+            if processed_list[index] is not None:
+                continue
+            count_reread(timings)
+            candidate = reocr_line(gray_image, top, bottom)
+            if candidate:
+                print(f"{index}: re-read as {candidate[0]} ({candidate[1]:.0f})")
+                processed_list[index] = candidate[0]
+
+    if None in processed_list:
+        return False
+    return match_classes(processed_list, timings)
+
+def read_culvert_scores(image_bytes, mode="full", timings=None):
+    # image_path = 'pg6.png'
+    # image = cv2.imread(image_path)
+
+    with timed(timings, "decode"):
+        image = decode_image(image_bytes)
+    if image is None:
+        return False
+    with timed(timings, "preprocess"):
+        gray_image = resize_gray(image)
+        final_image = binarize(gray_image)
+
+    if mode == "cells":
+        processed_list = read_rows_cells(gray_image, final_image, timings)
+    else:
+        processed_list = read_lines_full(gray_image, final_image, timings)
+    if not processed_list:
         return False
 
-    return processed_list
\ No newline at end of file
+    log_date = get_log_date()
+    processed_list = [entry + [log_date] for entry in processed_list]
+    for index, item in enumerate(processed_list):
+        print(f"{index}: {item}")
+    return processed_list
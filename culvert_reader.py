@@ -0,0 +1,119 @@
+import os
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from culvert_processor import read_culvert_scores, stamp_log_date
+from culvert_downloader import fetch_image
+from culvert_ocr_cache import OCRCache
+
+OCR_MODE = os.getenv('OCR_MODE', 'full')
+OCR_START_METHOD = os.getenv('OCR_START_METHOD', 'forkserver')
+
+ocr_executor = None
+ocr_cache = OCRCache(max_entries=int(os.getenv('OCR_CACHE_SIZE', 256)), path=os.getenv('OCR_CACHE_PATH'))
+pending_reads = {}
+
+def start_ocr_executor():
+    global ocr_executor
+    max_workers = int(os.getenv('OCR_WORKERS', 0)) or min(12, os.cpu_count() or 1)
+    start_method = OCR_START_METHOD if OCR_START_METHOD in multiprocessing.get_all_start_methods() else None
+    ocr_executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context(start_method))
+    return ocr_executor
+
+def get_ocr_executor():
+    if ocr_executor is None:
+        return start_ocr_executor()
+    return ocr_executor
+
+async def run_ocr(image_bytes, mode):
+    loop = asyncio.get_running_loop()
+    executor = get_ocr_executor()
+    try:
+        return await loop.run_in_executor(executor, read_culvert_scores, image_bytes, mode)
+    except BrokenProcessPool:
+        if executor is ocr_executor:
+            print("OCR worker pool broke, restarting it.")
+            executor.shutdown(wait=False, cancel_futures=True)
+            start_ocr_executor()
+        return await loop.run_in_executor(get_ocr_executor(), read_culvert_scores, image_bytes, mode)
+
+def finish_read(key, pending):
+    if pending_reads.get(key) is pending:
+        del pending_reads[key]
+    read = pending["read"]
+    if not read.cancelled() and read.exception() is None and read.result():
+        ocr_cache.put(key, read.result())
+
+async def read_culvert_image(image_bytes, mode=OCR_MODE):
+    key = OCRCache.key(image_bytes, mode)
+    cached_scores = ocr_cache.get(key)
+    if cached_scores is not None:
+        return stamp_log_date(cached_scores)
+    pending = pending_reads.get(key)
+    if pending is None:
+        pending = pending_reads[key] = {"read": asyncio.ensure_future(run_ocr(image_bytes, mode)), "waiters": 0}
+        pending["read"].add_done_callback(lambda done: finish_read(key, pending))
+    pending["waiters"] += 1
+    try:
+        return await asyncio.shield(pending["read"])
+    except asyncio.CancelledError:
+        if pending["waiters"] == 1:
+            if pending_reads.get(key) is pending:
+                del pending_reads[key]
+            pending["read"].cancel()
+        raise
+    finally:
+        pending["waiters"] -= 1
+
+async def find_duplicate(position, image_key, image_keys):
+    for earlier_position in range(position):
+        earlier_key = await image_keys[earlier_position]
+        if image_key is not None and image_key == earlier_key:
+            return earlier_position
+    return None
+
+async def read_culvert_screenshot_at(position, image_url, mode, image_keys):
+    image_key = None
+    try:
+        image_bytes = await fetch_image(image_url)
+        if image_bytes is None:
+            return position, False, None
+        image_key = OCRCache.key(image_bytes, mode)
+    finally:
+        image_keys[position].set_result(image_key)
+
+    duplicate_of = await find_duplicate(position, image_key, image_keys)
+    if duplicate_of is not None:
+        print(f"Screenshot {position} is a duplicate of screenshot {duplicate_of}, skipping OCR.")
+        return position, [], duplicate_of
+    return position, await read_culvert_image(image_bytes, mode), None
+
+async def stream_culvert_screenshots(image_urls, mode=OCR_MODE):
+    loop = asyncio.get_running_loop()
+    image_keys = [loop.create_future() for _ in image_urls]
+    tasks = [asyncio.create_task(read_culvert_screenshot_at(position, image_url, mode, image_keys)) for position, image_url in enumerate(image_urls)]
+    try:
+        for next_read in asyncio.as_completed(tasks):
+            yield await next_read
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        ocr_cache.save()
+        print(f"OCR cache: {ocr_cache.stats()}")
+
+def merge_overlapping_rows(screenshot_reads):
+    seen_rows = set()
+    merged_rows = []
+    for culvert_scores in screenshot_reads:
+        for entry in culvert_scores:
+            row_key = (entry[0].lower(), entry[1].lower(), entry[2], entry[3])
+            if row_key in seen_rows:
+                continue
+            seen_rows.add(row_key)
+            merged_rows.append(entry)
+    overlapping_rows = sum(len(culvert_scores) for culvert_scores in screenshot_reads) - len(merged_rows)
+    if overlapping_rows:
+        print(f"Dropped {overlapping_rows} rows repeated across overlapping screenshots.")
+    return merged_rows
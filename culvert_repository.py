@@ -0,0 +1,350 @@
+import os
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+
+SCORE_SCHEMA = os.getenv('SCORE_SCHEMA', 'array')
+SCORE_SCHEMAS = ("array", "rows")
+QUERY_MODE = os.getenv('QUERY_MODE', 'server')
+QUERY_MODES = ("server", "client")
+ARRAY_COLLECTION = 'player-scores'
+ROWS_COLLECTION = 'player-score-rows'
+
+def history_from_rows(rows):
+    histories = {}
+    for row in rows:
+        history = histories.get(row["name"])
+        if history is None:
+            history = histories[row["name"]] = {"name": row["name"], "class": row["class"], "level": row["level"], "score": [], "date": []}
+        history["class"] = row["class"]
+        history["level"] = row["level"]
+        history["score"].append(row["score"])
+        history["date"].append(row["date"])
+    return list(histories.values())
+
+def bulk_report(result=None):
+    if result is None:
+        return {"inserted": 0, "modified": 0}
+    return {"inserted": result.upserted_count, "modified": result.modified_count}
+
+def date_filter(start_date, end_date=None):
+    if end_date is None:
+        return start_date
+    return {"$gte": start_date, "$lte": end_date}
+
+def array_date_filter(start_date, end_date=None):
+    if end_date is None:
+        return start_date
+    return {"$elemMatch": {"$gte": start_date, "$lte": end_date}}
+
+def date_in_range(date_expression, start_date, end_date=None):
+    if end_date is None:
+        return {"$eq": [date_expression, start_date]}
+    return {"$and": [{"$gte": [date_expression, start_date]}, {"$lte": [date_expression, end_date]}]}
+
+def improvement_stages(limit):
+    return [
+        {"$match": {"last": {"$ne": 0}, "best": {"$nin": [0, None]}}},
+        {"$project": {"_id": 0, "name": 1, "change": {"$multiply": [{"$divide": [{"$subtract": ["$last", "$best"]}, "$best"]}, 100]}}},
+        {"$sort": {"change": -1, "name": 1}},
+        {"$limit": limit}
+    ]
+
+class ScoreRepository:
+    def __init__(self, query_mode=QUERY_MODE):
+        if query_mode not in QUERY_MODES:
+            raise ValueError(f"Unknown query mode {query_mode!r}, expected one of {', '.join(QUERY_MODES)}.")
+        self.query_mode = query_mode
+
+    def latest_scores(self):
+        if self.query_mode == "server":
+            return self.aggregate_latest_scores()
+        latest = [{"name": doc["name"], "score": doc["score"][-1]} for doc in self.find_all() if doc["score"]]
+        return sorted(latest, key=lambda x: x["name"])
+
+    def class_leaderboard(self, class_name):
+        if self.query_mode == "server":
+            return self.aggregate_class_leaderboard(class_name)
+        latest = [
+            {"name": doc["name"], "level": doc["level"], "score": doc["score"][-1], "date": doc["date"][-1]}
+            for doc in self.find_by_class(class_name) if doc["score"]
+        ]
+        return sorted(latest, key=lambda x: (-x["score"], x["name"]))
+
+    def recent_histories(self, count):
+        if self.query_mode == "server":
+            return self.aggregate_recent_histories(count)
+        return [{**doc, "score": doc["score"][-count:], "date": doc["date"][-count:]} for doc in self.find_all()]
+
+    def top_improvements(self, limit):
+        if self.query_mode == "server":
+            return self.aggregate_top_improvements(limit)
+        improvements = []
+        for doc in self.find_all():
+            if len(doc["score"]) > 1 and doc["score"][-1] != 0:
+                best = max(doc["score"][:-1])
+                if best == 0:
+                    continue
+                improvements.append({"name": doc["name"], "change": (doc["score"][-1] - best)/best*100})
+        return sorted(improvements, key=lambda x: (-x["change"], x["name"]))[:limit]
+
+class ArrayScoreRepository(ScoreRepository):
+    schema = "array"
+
+    def __init__(self, db, query_mode=QUERY_MODE):
+        super().__init__(query_mode)
+        self.collection = db[ARRAY_COLLECTION]
+
+    def find_member(self, name):
+        return self.collection.find_one({"name": name.lower()}, {"_id": 0})
+
+    def find_all(self):
+        return list(self.collection.find({}, {"_id": 0}))
+
+    def find_by_class(self, class_name):
+        return list(self.collection.find({"class": class_name}, {"_id": 0}))
+
+    def list_dates(self):
+        return sorted(self.collection.distinct("date"))
+
+    def scores_on_date(self, date):
+        scores = []
+        for doc in self.collection.find({"date": date}, {"_id": 0}):
+            scores.append({"name": doc["name"], "class": doc["class"], "level": doc["level"], "score": doc["score"][doc["date"].index(date)]})
+        return sorted(scores, key=lambda x: x["score"], reverse=True)
+
+    def dates_and_scores(self):
+        dates = []
+        scores = []
+        for doc in self.collection.find({}, {"_id": 0, "score": 1, "date": 1}):
+            member_dates = set()
+            for score, date in zip(doc["score"], doc["date"]):
+                if date in member_dates:
+                    continue
+                member_dates.add(date)
+                dates.append(date)
+                scores.append(score)
+        return dates, scores
+
+    def add_score(self, name, score, date, maple_class=None, level=None):
+        update = {"$push": {"score": score, "date": date}}
+        if level is not None:
+            update["$set"] = {"level": level}
+        if maple_class is not None:
+            update["$setOnInsert"] = {"class": maple_class.lower()}
+        return self.collection.update_one({"name": name.lower()}, update, upsert=maple_class is not None).matched_count > 0
+
+    def add_scores(self, entries):
+        if not entries:
+            return bulk_report()
+        return bulk_report(self.collection.bulk_write([
+            UpdateOne(
+                {"name": name.lower()},
+                {"$push": {"score": score, "date": date}, "$set": {"level": level}, "$setOnInsert": {"class": maple_class.lower()}},
+                upsert=True
+            )
+            for name, score, date, maple_class, level in entries
+        ], ordered=True))
+
+    def update_score(self, name, date, score):
+        member = self.collection.find_one({"name": name.lower()}, {"date": 1})
+        if member is None or date not in member["date"]:
+            return False
+        index = member["date"].index(date)
+        return self.collection.update_one({"_id": member["_id"]}, {"$set": {f"score.{index}": score}}).matched_count > 0
+
+    def remove_score(self, name, date):
+        member = self.collection.find_one({"name": name.lower()}, {"score": 1, "date": 1})
+        if member is None or date not in member["date"]:
+            return False
+        index = member["date"].index(date)
+        new_scores = member["score"][:index] + member["score"][index+1:]
+        new_dates = member["date"][:index] + member["date"][index+1:]
+        self.collection.update_one({"_id": member["_id"]}, {"$set": {"score": new_scores, "date": new_dates}})
+        return True
+
+    def remove_date(self, start_date, end_date=None):
+        kept_pairs = {"$filter": {
+            "input": {"$zip": {"inputs": ["$score", "$date"]}},
+            "as": "pair",
+            "cond": {"$not": [date_in_range({"$arrayElemAt": ["$$pair", 1]}, start_date, end_date)]}
+        }}
+        return self.collection.update_many({"date": array_date_filter(start_date, end_date)}, [
+            {"$set": {"pairs": kept_pairs}},
+            {"$set": {
+                "score": {"$map": {"input": "$pairs", "as": "pair", "in": {"$arrayElemAt": ["$$pair", 0]}}},
+                "date": {"$map": {"input": "$pairs", "as": "pair", "in": {"$arrayElemAt": ["$$pair", 1]}}}
+            }},
+            {"$unset": "pairs"}
+        ]).modified_count
+
+    def aggregate_latest_scores(self):
+        return list(self.collection.aggregate([
+            {"$match": {"score.0": {"$exists": True}}},
+            {"$project": {"_id": 0, "name": 1, "score": {"$arrayElemAt": ["$score", -1]}}},
+            {"$sort": {"name": 1}}
+        ]))
+
+    def aggregate_class_leaderboard(self, class_name):
+        return list(self.collection.aggregate([
+            {"$match": {"class": class_name, "score.0": {"$exists": True}}},
+            {"$project": {"_id": 0, "name": 1, "level": 1, "score": {"$arrayElemAt": ["$score", -1]}, "date": {"$arrayElemAt": ["$date", -1]}}},
+            {"$sort": {"score": -1, "name": 1}}
+        ]))
+
+    def aggregate_recent_histories(self, count):
+        return list(self.collection.find({}, {"_id": 0, "score": {"$slice": -count}, "date": {"$slice": -count}}))
+
+    def aggregate_top_improvements(self, limit):
+        return list(self.collection.aggregate([
+            {"$match": {"score.1": {"$exists": True}}},
+            {"$project": {
+                "name": 1,
+                "last": {"$arrayElemAt": ["$score", -1]},
+                "best": {"$max": {"$slice": ["$score", {"$subtract": [{"$size": "$score"}, 1]}]}}
+            }},
+            *improvement_stages(limit)
+        ]))
+
+    def update_member(self, name, new_name, maple_class, level=None):
+        update = {"name": new_name.lower().strip(), "class": maple_class.lower().strip()}
+        if level is not None:
+            update["level"] = level
+        return self.collection.update_one({"name": name.lower()}, {"$set": update}).matched_count > 0
+
+    def delete_member(self, name):
+        return self.collection.delete_one({"name": name.lower()}).deleted_count > 0
+
+class RowScoreRepository(ScoreRepository):
+    schema = "rows"
+
+    def __init__(self, db, query_mode=QUERY_MODE):
+        super().__init__(query_mode)
+        self.collection = db[ROWS_COLLECTION]
+
+    def find_member(self, name):
+        histories = history_from_rows(self.collection.find({"name": name.lower()}, {"_id": 0}).sort("date", ASCENDING))
+        return histories[0] if histories else None
+
+    def find_all(self):
+        return history_from_rows(self.collection.find({}, {"_id": 0}).sort([("name", ASCENDING), ("date", ASCENDING)]))
+
+    def find_by_class(self, class_name):
+        return history_from_rows(self.collection.find({"class": class_name}, {"_id": 0}).sort([("name", ASCENDING), ("date", ASCENDING)]))
+
+    def list_dates(self):
+        return sorted(self.collection.distinct("date"))
+
+    def scores_on_date(self, date):
+        return list(self.collection.find({"date": date}, {"_id": 0, "date": 0}).sort("score", DESCENDING))
+
+    def dates_and_scores(self):
+        rows = list(self.collection.find({}, {"_id": 0, "score": 1, "date": 1}))
+        return [row["date"] for row in rows], [row["score"] for row in rows]
+
+    def add_score(self, name, score, date, maple_class=None, level=None):
+        latest = self.collection.find_one({"name": name.lower()}, {"class": 1, "level": 1}, sort=[("date", DESCENDING)])
+        if latest is None and maple_class is None:
+            return False
+        row = {
+            "score": score,
+            "class": latest["class"] if latest else maple_class.lower(),
+            "level": level if level is not None else latest["level"]
+        }
+        self.collection.update_one({"name": name.lower(), "date": date}, {"$set": row}, upsert=True)
+        return True
+
+    def add_scores(self, entries):
+        if not entries:
+            return bulk_report()
+        return bulk_report(self.collection.bulk_write([
+            UpdateOne(
+                {"name": name.lower(), "date": date},
+                {"$set": {"score": score, "level": level}, "$setOnInsert": {"class": maple_class.lower()}},
+                upsert=True
+            )
+            for name, score, date, maple_class, level in entries
+        ], ordered=True))
+
+    def update_score(self, name, date, score):
+        return self.collection.update_one({"name": name.lower(), "date": date}, {"$set": {"score": score}}).matched_count > 0
+
+    def remove_score(self, name, date):
+        return self.collection.delete_one({"name": name.lower(), "date": date}).deleted_count > 0
+
+    def remove_date(self, start_date, end_date=None):
+        return self.collection.delete_many({"date": date_filter(start_date, end_date)}).deleted_count
+
+    def aggregate_latest_scores(self):
+        return list(self.collection.aggregate([
+            {"$sort": {"name": 1, "date": 1}},
+            {"$group": {"_id": "$name", "score": {"$last": "$score"}}},
+            {"$project": {"_id": 0, "name": "$_id", "score": 1}},
+            {"$sort": {"name": 1}}
+        ]))
+
+    def aggregate_class_leaderboard(self, class_name):
+        return list(self.collection.aggregate([
+            {"$match": {"class": class_name}},
+            {"$sort": {"name": 1, "date": 1}},
+            {"$group": {"_id": "$name", "level": {"$last": "$level"}, "score": {"$last": "$score"}, "date": {"$last": "$date"}}},
+            {"$project": {"_id": 0, "name": "$_id", "level": 1, "score": 1, "date": 1}},
+            {"$sort": {"score": -1, "name": 1}}
+        ]))
+
+    def aggregate_recent_histories(self, count):
+        return history_from_rows(self.collection.aggregate([
+            {"$setWindowFields": {"partitionBy": "$name", "sortBy": {"date": -1}, "output": {"recency": {"$documentNumber": {}}}}},
+            {"$match": {"recency": {"$lte": count}}},
+            {"$project": {"_id": 0, "recency": 0}},
+            {"$sort": {"name": 1, "date": 1}}
+        ]))
+
+    def aggregate_top_improvements(self, limit):
+        return list(self.collection.aggregate([
+            {"$setWindowFields": {"partitionBy": "$name", "sortBy": {"date": 1}, "output": {
+                "best": {"$max": "$score", "window": {"documents": ["unbounded", -1]}}
+            }}},
+            {"$sort": {"name": 1, "date": 1}},
+            {"$group": {"_id": "$name", "last": {"$last": "$score"}, "best": {"$last": "$best"}}},
+            {"$project": {"name": "$_id", "last": 1, "best": 1}},
+            *improvement_stages(limit)
+        ]))
+
+    def update_member(self, name, new_name, maple_class, level=None):
+        result = self.collection.update_many({"name": name.lower()}, {"$set": {"name": new_name.lower().strip(), "class": maple_class.lower().strip()}})
+        if level is not None:
+            latest = self.collection.find_one({"name": new_name.lower().strip()}, {"_id": 1}, sort=[("date", DESCENDING)])
+            if latest:
+                self.collection.update_one({"_id": latest["_id"]}, {"$set": {"level": level}})
+        return result.matched_count > 0
+
+    def delete_member(self, name):
+        return self.collection.delete_many({"name": name.lower()}).deleted_count > 0
+
+def create_score_repository(db, schema=SCORE_SCHEMA, query_mode=QUERY_MODE):
+    if schema == "rows":
+        return RowScoreRepository(db, query_mode)
+    if schema == "array":
+        return ArrayScoreRepository(db, query_mode)
+    raise ValueError(f"Unknown score schema {schema!r}, expected one of {', '.join(SCORE_SCHEMAS)}.")
+
+def migrate_array_to_rows(db, batch_size=1000):
+    source = ArrayScoreRepository(db)
+    target = RowScoreRepository(db)
+    members = 0
+    rows = 0
+    operations = []
+    for doc in source.collection.find({}, {"_id": 0}):
+        members += 1
+        for score, date in zip(doc["score"], doc["date"]):
+            operations.append(UpdateOne(
+                {"name": doc["name"], "date": date},
+                {"$set": {"score": score, "class": doc["class"], "level": doc["level"]}},
+                upsert=True
+            ))
+            rows += 1
+            if len(operations) >= batch_size:
+                target.collection.bulk_write(operations, ordered=False)
+                operations = []
+    if operations:
+        target.collection.bulk_write(operations, ordered=False)
+    return members, rows
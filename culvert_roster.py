@@ -0,0 +1,38 @@
+import os
+import time
+
+ROSTER_REFRESH_SECONDS = float(os.getenv('ROSTER_REFRESH_SECONDS', 0))
+ROSTER_FIELDS = ("name", "class", "discord_id", "name_lower")
+
+class RosterCache:
+    def __init__(self, members, refresh_seconds=ROSTER_REFRESH_SECONDS):
+        self.members = members
+        self.refresh_seconds = refresh_seconds
+        self.members_by_name = None
+        self.loaded_at = 0
+
+    async def load(self):
+        expired = self.refresh_seconds and time.monotonic() - self.loaded_at > self.refresh_seconds
+        if self.members_by_name is None or expired:
+            docs = await self.members.find_all()
+            self.members_by_name = {doc["name_lower"]: {field: doc.get(field) for field in ROSTER_FIELDS} for doc in docs}
+            self.loaded_at = time.monotonic()
+        return self.members_by_name
+
+    def display_name(self, name_lower):
+        member = self.members_by_name.get(name_lower) if self.members_by_name is not None else None
+        return member["name"] if member else name_lower
+
+    def put(self, member):
+        if self.members_by_name is not None:
+            self.members_by_name[member["name_lower"]] = {field: member.get(field) for field in ROSTER_FIELDS}
+
+    def remove(self, name_lower):
+        if self.members_by_name is not None:
+            self.members_by_name.pop(name_lower, None)
+
+    def reset_discord_ids(self, discord_ids):
+        if self.members_by_name is not None:
+            for member in self.members_by_name.values():
+                if member["discord_id"] in discord_ids:
+                    member["discord_id"] = 0
@@ -0,0 +1,252 @@
+import os
+import sqlite3
+import threading
+from itertools import groupby
+from culvert_repository import ScoreRepository, QUERY_MODE, history_from_rows, bulk_report
+from culvert_alias_table import AliasTable
+from culvert_leaderboards import LeaderboardStore, build_leaderboard
+from culvert_guild_totals import GuildTotalsSeries, summarize_scores
+
+SQLITE_PATH = os.getenv('SQLITE_PATH', 'culvert.sqlite3')
+SQLITE_BUSY_TIMEOUT = float(os.getenv('SQLITE_BUSY_TIMEOUT', 5))
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS members (
+    id INTEGER PRIMARY KEY,
+    name_lower TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    class TEXT NOT NULL,
+    discord_id
+);
+CREATE INDEX IF NOT EXISTS members_discord_id ON members (discord_id);
+CREATE TABLE IF NOT EXISTS scores (
+    name TEXT NOT NULL,
+    date TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    class TEXT NOT NULL,
+    level INTEGER,
+    PRIMARY KEY (name, date)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS scores_date_score ON scores (date, score DESC);
+CREATE INDEX IF NOT EXISTS scores_class_name_date ON scores (class, name, date);
+CREATE TABLE IF NOT EXISTS aliases (
+    alias TEXT PRIMARY KEY,
+    name_lower TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS aliases_name_lower ON aliases (name_lower);
+"""
+SCORE_COLUMNS = "name, class, level, score, date"
+MEMBER_COLUMNS = "name, class, discord_id, name_lower"
+RANKED_SCORES = "SELECT *, ROW_NUMBER() OVER (PARTITION BY name ORDER BY date DESC) AS recency FROM scores"
+
+def dict_factory(cursor, row):
+    return {column[0]: value for column, value in zip(cursor.description, row)}
+
+def date_condition(start_date, end_date=None):
+    if end_date is None:
+        return "date = ?", (start_date,)
+    return "date BETWEEN ? AND ?", (start_date, end_date)
+
+class SqliteDatabase:
+    def __init__(self, path=SQLITE_PATH):
+        self.path = path
+        self.local = threading.local()
+        self.connection().executescript(SQLITE_SCHEMA)
+
+    def connection(self):
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=SQLITE_BUSY_TIMEOUT)
+            connection.row_factory = dict_factory
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self.local.connection = connection
+        return connection
+
+    def query(self, sql, parameters=()):
+        return self.connection().execute(sql, parameters).fetchall()
+
+    def query_one(self, sql, parameters=()):
+        return self.connection().execute(sql, parameters).fetchone()
+
+    def execute(self, sql, parameters=()):
+        with self.connection() as connection:
+            return connection.execute(sql, parameters).rowcount
+
+    def execute_many(self, sql, rows):
+        with self.connection() as connection:
+            return connection.executemany(sql, rows).rowcount
+
+class SqliteScoreRepository(ScoreRepository):
+    schema = "sqlite"
+
+    def __init__(self, database, query_mode=QUERY_MODE):
+        super().__init__(query_mode)
+        self.database = database
+
+    def find_member(self, name):
+        histories = history_from_rows(self.database.query(f"SELECT {SCORE_COLUMNS} FROM scores WHERE name = ? ORDER BY date", (name.lower(),)))
+        return histories[0] if histories else None
+
+    def find_all(self):
+        return history_from_rows(self.database.query(f"SELECT {SCORE_COLUMNS} FROM scores ORDER BY name, date"))
+
+    def find_by_class(self, class_name):
+        return history_from_rows(self.database.query(f"SELECT {SCORE_COLUMNS} FROM scores WHERE class = ? ORDER BY name, date", (class_name,)))
+
+    def list_dates(self):
+        return [row["date"] for row in self.database.query("SELECT DISTINCT date FROM scores ORDER BY date")]
+
+    def scores_on_date(self, date):
+        return self.database.query("SELECT name, class, level, score FROM scores WHERE date = ? ORDER BY score DESC", (date,))
+
+    def dates_and_scores(self):
+        rows = self.database.query("SELECT date, score FROM scores")
+        return [row["date"] for row in rows], [row["score"] for row in rows]
+
+    def add_score(self, name, score, date, maple_class=None, level=None):
+        latest = self.database.query_one("SELECT class, level FROM scores WHERE name = ? ORDER BY date DESC LIMIT 1", (name.lower(),))
+        if latest is None and maple_class is None:
+            return False
+        self.database.execute(
+            "INSERT INTO scores (name, date, score, class, level) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (name, date) DO UPDATE SET score = excluded.score, class = excluded.class, level = excluded.level",
+            (name.lower(), date, score, latest["class"] if latest else maple_class.lower(), level if level is not None else latest["level"])
+        )
+        return True
+
+    def add_scores(self, entries):
+        if not entries:
+            return bulk_report()
+        rows = [
+            {"name": name.lower(), "date": date, "score": score, "class": maple_class.lower(), "level": level}
+            for name, score, date, maple_class, level in entries
+        ]
+        with self.database.connection() as connection:
+            modified = connection.executemany(
+                "UPDATE scores SET score = :score, level = :level WHERE name = :name AND date = :date AND (score IS NOT :score OR level IS NOT :level)", rows
+            ).rowcount
+            inserted = connection.executemany("INSERT OR IGNORE INTO scores (name, date, score, class, level) VALUES (:name, :date, :score, :class, :level)", rows).rowcount
+        return {"inserted": inserted, "modified": modified}
+
+    def update_score(self, name, date, score):
+        return self.database.execute("UPDATE scores SET score = ? WHERE name = ? AND date = ?", (score, name.lower(), date)) > 0
+
+    def remove_score(self, name, date):
+        return self.database.execute("DELETE FROM scores WHERE name = ? AND date = ?", (name.lower(), date)) > 0
+
+    def remove_date(self, start_date, end_date=None):
+        condition, parameters = date_condition(start_date, end_date)
+        return self.database.execute(f"DELETE FROM scores WHERE {condition}", parameters)
+
+    def update_member(self, name, new_name, maple_class, level=None):
+        new_name = new_name.lower().strip()
+        with self.database.connection() as connection:
+            matched = connection.execute("UPDATE scores SET name = ?, class = ? WHERE name = ?", (new_name, maple_class.lower().strip(), name.lower())).rowcount
+            if level is not None:
+                connection.execute("UPDATE scores SET level = ? WHERE name = ? AND date = (SELECT MAX(date) FROM scores WHERE name = ?)", (level, new_name, new_name))
+        return matched > 0
+
+    def delete_member(self, name):
+        return self.database.execute("DELETE FROM scores WHERE name = ?", (name.lower(),)) > 0
+
+    def aggregate_latest_scores(self):
+        return self.database.query(f"SELECT name, score FROM ({RANKED_SCORES}) WHERE recency = 1 ORDER BY name")
+
+    def aggregate_class_leaderboard(self, class_name):
+        return self.database.query(
+            f"SELECT name, level, score, date FROM ({RANKED_SCORES} WHERE class = ?) WHERE recency = 1 ORDER BY score DESC, name",
+            (class_name,)
+        )
+
+    def aggregate_recent_histories(self, count):
+        return history_from_rows(self.database.query(f"SELECT {SCORE_COLUMNS} FROM ({RANKED_SCORES}) WHERE recency <= ? ORDER BY name, date", (count,)))
+
+    def aggregate_top_improvements(self, limit):
+        return self.database.query(
+            "SELECT name, (score - best) * 1.0 / best * 100 AS change FROM ("
+            "SELECT name, score, ROW_NUMBER() OVER (PARTITION BY name ORDER BY date DESC) AS recency, "
+            "MAX(score) OVER (PARTITION BY name ORDER BY date ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING) AS best FROM scores"
+            ") WHERE recency = 1 AND score != 0 AND best != 0 ORDER BY change DESC, name LIMIT ?",
+            (limit,)
+        )
+
+class SqliteMemberRepository:
+    def __init__(self, database):
+        self.database = database
+
+    def find(self, name):
+        return self.database.query_one(f"SELECT {MEMBER_COLUMNS} FROM members WHERE name_lower = ?", (name.lower(),))
+
+    def find_all(self):
+        return self.database.query(f"SELECT {MEMBER_COLUMNS} FROM members ORDER BY name")
+
+    def latest(self):
+        return self.database.query_one(f"SELECT {MEMBER_COLUMNS} FROM members ORDER BY id DESC LIMIT 1")
+
+    def count(self):
+        return self.database.query_one("SELECT COUNT(*) AS members FROM members")["members"]
+
+    def add(self, member):
+        self.database.execute("INSERT INTO members (name, class, discord_id, name_lower) VALUES (:name, :class, :discord_id, :name_lower)", member)
+
+    def update(self, name, member):
+        return self.database.execute(
+            "UPDATE members SET name = :name, class = :class, discord_id = :discord_id, name_lower = :name_lower WHERE name_lower = :match",
+            {**member, "match": name.lower()}
+        ) > 0
+
+    def remove(self, name):
+        return self.database.execute("DELETE FROM members WHERE name_lower = ?", (name.lower(),)) > 0
+
+    def reset_discord_ids(self, discord_ids):
+        return self.database.execute_many("UPDATE members SET discord_id = 0 WHERE discord_id = ?", [(discord_id,) for discord_id in discord_ids])
+
+class SqliteAliasTable(AliasTable):
+    def __init__(self, database):
+        super().__init__(None)
+        self.database = database
+
+    def read_aliases(self):
+        return {row["alias"]: row["name_lower"] for row in self.database.query("SELECT alias, name_lower FROM aliases")}
+
+    def write_aliases(self, learned):
+        self.database.execute_many(
+            "INSERT INTO aliases (alias, name_lower) VALUES (?, ?) ON CONFLICT (alias) DO UPDATE SET name_lower = excluded.name_lower",
+            list(learned.items())
+        )
+
+    def delete_aliases(self, name_lower):
+        return self.database.execute("DELETE FROM aliases WHERE name_lower = ?", (name_lower,))
+
+class SqliteLeaderboards(LeaderboardStore):
+    def __init__(self, score_repository):
+        super().__init__(None, score_repository)
+
+    def refresh(self, dates):
+        return 0
+
+    def remove_dates(self, start_date, end_date=None):
+        return 0
+
+    def get(self, date):
+        scores = self.score_repository.scores_on_date(date)
+        return build_leaderboard(date, scores) if scores else None
+
+class SqliteGuildTotals(GuildTotalsSeries):
+    def __init__(self, database, score_repository):
+        super().__init__(None, score_repository)
+        self.database = database
+        self.built = True
+
+    def update(self, scores_by_date):
+        return 0
+
+    def remove_dates(self, start_date, end_date=None):
+        return 0
+
+    def rebuild(self):
+        return len(self.score_repository.list_dates())
+
+    def series(self):
+        rows = self.database.query("SELECT date, score FROM scores ORDER BY date")
+        return [summarize_scores(date, [row["score"] for row in date_rows]) for date, date_rows in groupby(rows, key=lambda row: row["date"])]
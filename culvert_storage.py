@@ -0,0 +1,81 @@
+import os
+import certifi
+from pymongo.mongo_client import MongoClient
+from culvert_repository import create_score_repository
+from culvert_indexes import ensure_indexes, report_indexes, NAMES_COLLECTION
+from culvert_members import MemberRepository
+from culvert_alias_table import AliasTable
+from culvert_leaderboards import LeaderboardStore, LEADERBOARDS_COLLECTION
+from culvert_guild_totals import GuildTotalsSeries, GUILD_TOTALS_COLLECTION
+from culvert_sqlite import SqliteDatabase, SqliteScoreRepository, SqliteMemberRepository, SqliteAliasTable, SqliteLeaderboards, SqliteGuildTotals, SQLITE_PATH
+
+STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 'mongo')
+STORAGE_BACKENDS = ("mongo", "sqlite")
+MONGO_DATABASE = 'culvert-score-database'
+ALIASES_COLLECTION = 'ocr-aliases'
+
+class Storage:
+    def __init__(self, backend, members, scores, aliases, guild_totals, leaderboards):
+        self.backend = backend
+        self.members = members
+        self.scores = scores
+        self.aliases = aliases
+        self.guild_totals = guild_totals
+        self.leaderboards = leaderboards
+
+def open_mongo_storage(uri):
+    db_client = MongoClient(uri, tlsCAFile=certifi.where())
+    try:
+        db_client.admin.command('ping')
+        print("Connected to MongoDB.")
+    except Exception as e:
+        print(e)
+    db_culvert = db_client[MONGO_DATABASE]
+    scores = create_score_repository(db_culvert)
+    ensure_indexes(db_culvert, [NAMES_COLLECTION, scores.collection.name])
+    report_indexes(db_culvert, [NAMES_COLLECTION, scores.collection.name])
+    guild_totals = GuildTotalsSeries(db_culvert[GUILD_TOTALS_COLLECTION], scores)
+    return Storage(
+        "mongo",
+        MemberRepository(db_culvert[NAMES_COLLECTION]),
+        scores,
+        AliasTable(db_culvert[ALIASES_COLLECTION]),
+        guild_totals,
+        LeaderboardStore(db_culvert[LEADERBOARDS_COLLECTION], scores, guild_totals)
+    )
+
+def open_sqlite_storage(path=SQLITE_PATH):
+    database = SqliteDatabase(path)
+    scores = SqliteScoreRepository(database)
+    print(f"Using SQLite database {path}.")
+    return Storage(
+        "sqlite",
+        SqliteMemberRepository(database),
+        scores,
+        SqliteAliasTable(database),
+        SqliteGuildTotals(database, scores),
+        SqliteLeaderboards(scores)
+    )
+
+def open_storage(backend=STORAGE_BACKEND, uri=None, sqlite_path=SQLITE_PATH):
+    if backend == "mongo":
+        return open_mongo_storage(uri)
+    if backend == "sqlite":
+        return open_sqlite_storage(sqlite_path)
+    raise ValueError(f"Unknown storage backend {backend!r}, expected one of {', '.join(STORAGE_BACKENDS)}.")
+
+def copy_storage(source, target):
+    members = source.members.find_all()
+    for member in members:
+        if target.members.find(member["name_lower"]) is None:
+            target.members.add(member)
+    entries = [
+        (history["name"], score, date, history["class"], history["level"])
+        for history in source.scores.find_all()
+        for score, date in zip(history["score"], history["date"])
+    ]
+    report = target.scores.add_scores(entries)
+    aliases = source.aliases.load()
+    if aliases:
+        target.aliases.write_aliases(aliases)
+    return len(members), report, len(aliases)
@@ -0,0 +1,109 @@
+import sys
+import json
+import time
+import random
+import argparse
+from culvert_class_catalog import class_catalog
+from culvert_name_matcher import link_names, link_names_optimal
+
+NAME_CHARACTERS = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"
+OCR_CONFUSIONS = {
+    "l": "1", "I": "l", "i": "l", "O": "0", "o": "0", "S": "5", "s": "5",
+    "B": "8", "Z": "2", "g": "9", "q": "9", "e": "c", "a": "o", "n": "m", "u": "v"
+}
+
+def generate_roster(size, rng):
+    names = set()
+    while len(names) < size:
+        names.add(''.join(rng.choice(NAME_CHARACTERS) for _ in range(rng.randint(4, 12))))
+    return [{"name": name, "class": rng.choice(class_catalog.names).lower(), "discord_id": None, "name_lower": name.lower()} for name in sorted(names)]
+
+def add_ocr_noise(name, error_rate, rng):
+    noisy = []
+    for char in name:
+        roll = rng.random()
+        if roll < error_rate / 2:
+            noisy.append(OCR_CONFUSIONS.get(char, rng.choice(NAME_CHARACTERS)))
+        elif roll < error_rate * 3 / 4:
+            continue
+        elif roll < error_rate:
+            noisy.append(char + rng.choice(NAME_CHARACTERS))
+        else:
+            noisy.append(char)
+    return ''.join(noisy) or name
+
+def generate_ocr_rows(roster, error_rate, class_error_rate, rng):
+    rows = []
+    truth = {}
+    for member in roster:
+        maple_class = member["class"].title()
+        if rng.random() < class_error_rate:
+            maple_class = rng.choice(class_catalog.names)
+        row = [add_ocr_noise(member["name"], error_rate, rng), maple_class, rng.randint(200, 300), rng.randint(0, 150000), "2024-01-01"]
+        truth[id(row)] = member["name"]
+        rows.append(row)
+    rng.shuffle(rows)
+    return rows, truth
+
+def postprocess(linked_names, roster):
+    members_by_name = {member["name_lower"]: member for member in roster}
+    linked_names = sorted(linked_names, key=lambda x: x[2][3], reverse=True)
+    return [members_by_name[entry[1].lower()] for entry in linked_names]
+
+def run_matcher(mode, ocr_rows, roster, min_similarity):
+    if mode == "greedy":
+        return link_names(ocr_rows, roster)
+    return link_names_optimal(ocr_rows, roster, min_similarity)[0]
+
+def benchmark_size(size, args, rng):
+    roster = generate_roster(size, rng)
+    ocr_rows, truth = generate_ocr_rows(roster, args.error_rate, args.class_error_rate, rng)
+    results = []
+    for mode in args.modes:
+        match_seconds = []
+        for _ in range(args.repeats):
+            start_time = time.perf_counter()
+            linked_names = run_matcher(mode, ocr_rows, roster, args.min_similarity)
+            match_seconds.append(time.perf_counter() - start_time)
+        start_time = time.perf_counter()
+        postprocess(linked_names, roster)
+        postprocess_seconds = time.perf_counter() - start_time
+        correct = sum(truth.get(id(entry[2])) == entry[1] for entry in linked_names)
+        results.append({
+            "size": size,
+            "mode": mode,
+            "match_ms": 1000 * min(match_seconds),
+            "postprocess_ms": 1000 * postprocess_seconds,
+            "linked": len(linked_names),
+            "accuracy": correct / size
+        })
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark roster matching on synthetic rosters with OCR-noised names.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[200, 1000, 10000])
+    parser.add_argument("--modes", nargs="+", choices=("greedy", "optimal"), default=["greedy", "optimal"])
+    parser.add_argument("--error-rate", type=float, default=0.1, help="Per-character probability of an OCR substitution, deletion or insertion.")
+    parser.add_argument("--class-error-rate", type=float, default=0.01, help="Probability that a row's class is misread as another class.")
+    parser.add_argument("--min-similarity", type=float, default=0.3)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write results to this JSON file.")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    results = []
+    print(f"{'size':>7}{'mode':>9}{'match ms':>11}{'post ms':>10}{'linked':>8}{'accuracy':>10}")
+    for size in args.sizes:
+        for result in benchmark_size(size, args, rng):
+            results.append(result)
+            print(f"{result['size']:>7}{result['mode']:>9}{result['match_ms']:>11.1f}{result['postprocess_ms']:>10.1f}{result['linked']:>8}{result['accuracy'] * 100:>9.2f}%")
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump({"settings": vars(args), "results": results}, file, indent=2)
+        print(f"\nResults written to {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
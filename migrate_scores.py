@@ -0,0 +1,25 @@
+import os
+import sys
+import certifi
+import argparse
+from dotenv import load_dotenv
+from pymongo.mongo_client import MongoClient
+from culvert_repository import migrate_array_to_rows, ARRAY_COLLECTION, ROWS_COLLECTION
+from culvert_indexes import ensure_indexes
+
+def main():
+    parser = argparse.ArgumentParser(description=f"Copy culvert scores from the per-member '{ARRAY_COLLECTION}' arrays into one '{ROWS_COLLECTION}' document per member and date.")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    load_dotenv()
+    db_client = MongoClient(os.getenv('APP_URI'), tlsCAFile=certifi.where())
+    db_culvert = db_client['culvert-score-database']
+    ensure_indexes(db_culvert, [ROWS_COLLECTION])
+    members, rows = migrate_array_to_rows(db_culvert, args.batch_size)
+    print(f"Migrated {rows} scores for {members} members into '{ROWS_COLLECTION}'.")
+    print(f"'{ROWS_COLLECTION}' now holds {db_culvert[ROWS_COLLECTION].count_documents({})} scores. Set SCORE_SCHEMA=rows to use it.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,22 @@
+import os
+import sys
+import argparse
+from dotenv import load_dotenv
+from culvert_storage import open_mongo_storage, open_sqlite_storage, copy_storage
+from culvert_sqlite import SQLITE_PATH
+
+def main():
+    parser = argparse.ArgumentParser(description="Copy members, scores and OCR aliases from MongoDB into a local SQLite database.")
+    parser.add_argument("--sqlite-path", default=SQLITE_PATH)
+    args = parser.parse_args()
+
+    load_dotenv()
+    source = open_mongo_storage(os.getenv('APP_URI'))
+    target = open_sqlite_storage(args.sqlite_path)
+    members, report, aliases = copy_storage(source, target)
+    print(f"Copied {members} members, {report['inserted']} new and {report['modified']} changed scores, and {aliases} aliases into {args.sqlite_path}.")
+    print("Set STORAGE_BACKEND=sqlite to use it.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
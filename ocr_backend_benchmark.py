@@ -0,0 +1,58 @@
+import sys
+import time
+import argparse
+import statistics
+from pathlib import Path
+from culvert_processor import decode_image, preprocess_image
+from culvert_ocr_backend import SubprocessOCRBackend, TesserocrOCRBackend, tesserocr
+
+TESSERACT_CONFIG = r'--oem 3 --psm 6'
+
+def load_images(paths):
+    images = []
+    for path in paths:
+        path = Path(path)
+        files = sorted(path.glob("*.png")) + sorted(path.glob("*.jpg")) if path.is_dir() else [path]
+        for file in files:
+            image = decode_image(file.read_bytes())
+            if image is None:
+                print(f"Skipping {file}: unable to decode.")
+                continue
+            images.append((file.name, preprocess_image(image)))
+    return images
+
+def time_backend(backend, images, repeats):
+    backend.image_to_string(images[0][1], TESSERACT_CONFIG)
+    latencies = []
+    for _ in range(repeats):
+        for _, image in images:
+            start_time = time.perf_counter()
+            backend.image_to_string(image, TESSERACT_CONFIG)
+            latencies.append((time.perf_counter() - start_time) * 1000)
+    return latencies
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-image OCR latency of the subprocess and in-process tesseract backends.")
+    parser.add_argument("images", nargs="+", help="Screenshot files or directories of screenshots.")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    images = load_images(args.images)
+    if not images:
+        print("No images to benchmark.")
+        return 1
+
+    backends = [SubprocessOCRBackend()]
+    if tesserocr is not None:
+        backends.append(TesserocrOCRBackend())
+    else:
+        print("tesserocr is not installed, only benchmarking the subprocess backend.")
+
+    print(f"{'backend':<12}{'images':>8}{'mean ms':>10}{'median ms':>11}{'min ms':>9}{'max ms':>9}")
+    for backend in backends:
+        latencies = time_backend(backend, images, args.repeats)
+        print(f"{backend.name:<12}{len(latencies):>8}{statistics.mean(latencies):>10.1f}{statistics.median(latencies):>11.1f}{min(latencies):>9.1f}{max(latencies):>9.1f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
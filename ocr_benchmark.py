@@ -0,0 +1,127 @@
+import io
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+from datetime import datetime
+from contextlib import redirect_stdout
+from culvert_processor import read_culvert_scores, remove_accents, OCR_MODES
+from culvert_class_catalog import normalize_class
+from culvert_ocr_backend import get_ocr_backend
+
+STAGES = ("decode", "preprocess", "segmentation", "digits", "tesseract", "parsing", "reocr", "class_match")
+FIELDS = ("name", "class", "level", "score")
+IMAGE_SUFFIXES = (".png", ".jpg", ".jpeg")
+
+def load_corpus(corpus_dir):
+    corpus = []
+    for image_path in sorted(Path(corpus_dir).iterdir()):
+        if image_path.suffix.lower() not in IMAGE_SUFFIXES:
+            continue
+        truth_path = image_path.with_suffix(".json")
+        if not truth_path.exists():
+            print(f"Skipping {image_path.name}: no ground truth at {truth_path.name}.")
+            continue
+        with open(truth_path, "r", encoding="utf-8") as file:
+            corpus.append((image_path.name, image_path.read_bytes(), json.load(file)))
+    return corpus
+
+def field_matches(field, read_value, true_value):
+    if field == "name":
+        return remove_accents(str(read_value)).lower() == remove_accents(str(true_value)).lower()
+    if field == "class":
+        return normalize_class(str(read_value)) == normalize_class(str(true_value))
+    return int(read_value) == int(true_value)
+
+def score_rows(rows, truth):
+    correct = {field: 0 for field in FIELDS}
+    for index, true_row in enumerate(truth):
+        if not rows or index >= len(rows):
+            break
+        for column, field in enumerate(FIELDS):
+            if field_matches(field, rows[index][column], true_row[field]):
+                correct[field] += 1
+    return correct
+
+def benchmark_image(image_name, image_bytes, truth, mode, quiet):
+    timings = {}
+    start_time = time.perf_counter()
+    if quiet:
+        with redirect_stdout(io.StringIO()):
+            rows = read_culvert_scores(image_bytes, mode, timings)
+    else:
+        rows = read_culvert_scores(image_bytes, mode, timings)
+    elapsed = time.perf_counter() - start_time
+    return {
+        "image": image_name,
+        "mode": mode,
+        "failed": not rows,
+        "rows_read": len(rows) if rows else 0,
+        "rows_expected": len(truth),
+        "seconds": elapsed,
+        "stages": {stage: timings.get(stage, 0) for stage in STAGES},
+        "reocr_lines": timings.get("reocr_lines", 0),
+        "correct": score_rows(rows, truth)
+    }
+
+def summarize(results):
+    total_seconds = sum(result["seconds"] for result in results)
+    rows_read = sum(result["rows_read"] for result in results)
+    rows_expected = sum(result["rows_expected"] for result in results)
+    return {
+        "images": len(results),
+        "failures": sum(result["failed"] for result in results),
+        "seconds": total_seconds,
+        "rows_per_second": rows_read / total_seconds if total_seconds else 0,
+        "stages_ms_per_image": {stage: 1000 * sum(result["stages"][stage] for result in results) / len(results) for stage in STAGES},
+        "reocr_lines_per_image": sum(result["reocr_lines"] for result in results) / len(results),
+        "accuracy": {field: sum(result["correct"][field] for result in results) / rows_expected if rows_expected else 0 for field in FIELDS}
+    }
+
+def print_summary(mode, summary):
+    print(f"\nMode: {mode} ({summary['images']} images, {summary['failures']} failed, {summary['rows_per_second']:.1f} rows/s)")
+    for stage, ms in summary["stages_ms_per_image"].items():
+        print(f"  {stage:<14}{ms:>9.1f} ms/image")
+    print(f"  {'reocr lines':<14}{summary['reocr_lines_per_image']:>9.1f} /image")
+    for field, accuracy in summary["accuracy"].items():
+        print(f"  {field:<14}{accuracy * 100:>8.2f}% correct")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark OCR accuracy and latency over a directory of guild page screenshots with ground truth JSON.")
+    parser.add_argument("corpus", help="Directory of screenshots, each with a same-named .json list of {name, class, level, score} rows.")
+    parser.add_argument("--mode", choices=OCR_MODES, action="append", help="OCR mode to benchmark. Repeat to compare modes. Defaults to all modes.")
+    parser.add_argument("--repeats", type=int, default=1)
+    parser.add_argument("--output", help="Write machine-readable results to this JSON file.")
+    parser.add_argument("--verbose", action="store_true", help="Show the processor's per-line output.")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    if not corpus:
+        print("No screenshots with ground truth found.")
+        return 1
+
+    report = {
+        "run_at": datetime.utcnow().isoformat(timespec="seconds"),
+        "backend": get_ocr_backend().name,
+        "repeats": args.repeats,
+        "modes": {}
+    }
+    for mode in args.mode or OCR_MODES:
+        results = [
+            benchmark_image(image_name, image_bytes, truth, mode, not args.verbose)
+            for _ in range(args.repeats)
+            for image_name, image_bytes, truth in corpus
+        ]
+        summary = summarize(results)
+        report["modes"][mode] = {"summary": summary, "images": results}
+        print_summary(mode, summary)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+        print(f"\nResults written to {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+import sys
+import json
+import time
+import random
+import argparse
+import bson
+from datetime import datetime, timedelta
+from pymongo import monitoring
+from pymongo.mongo_client import MongoClient
+from culvert_indexes import ensure_indexes
+from culvert_repository import create_score_repository, ARRAY_COLLECTION, ROWS_COLLECTION, SCORE_SCHEMAS, QUERY_MODES
+
+BENCHMARK_CLASSES = ("hero", "bishop", "night lord", "shadower", "dark knight")
+BENCHMARK_QUERIES = [
+    ("announce", lambda repository: repository.recent_histories(2)),
+    ("changes", lambda repository: repository.top_improvements(5)),
+    ("download", lambda repository: repository.latest_scores()),
+    ("saga class", lambda repository: repository.class_leaderboard(BENCHMARK_CLASSES[0]))
+]
+
+class ReplyBytesListener(monitoring.CommandListener):
+    def __init__(self):
+        self.reply_bytes = 0
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        self.reply_bytes += len(bson.encode(event.reply))
+
+    def failed(self, event):
+        pass
+
+def seed_database(db, members, dates, rng):
+    dates = [(datetime(2024, 1, 3) + timedelta(weeks=week)).strftime("%Y-%m-%d") for week in range(dates)]
+    histories = []
+    for index in range(members):
+        joined = rng.randrange(len(dates))
+        base = rng.randint(1000, 60000)
+        histories.append({
+            "name": f"member{index}",
+            "class": rng.choice(BENCHMARK_CLASSES),
+            "level": rng.randint(200, 285),
+            "score": [max(0, base + rng.randint(-5000, 8000) * week) for week in range(len(dates) - joined)],
+            "date": dates[joined:]
+        })
+    db[ARRAY_COLLECTION].insert_many([dict(history) for history in histories])
+    db[ROWS_COLLECTION].insert_many([
+        {"name": history["name"], "class": history["class"], "level": history["level"], "score": score, "date": date}
+        for history in histories
+        for score, date in zip(history["score"], history["date"])
+    ])
+
+def benchmark_query(repository, query, listener, repeats):
+    timings = []
+    for _ in range(repeats):
+        listener.reply_bytes = 0
+        started = time.perf_counter()
+        result = query(repository)
+        timings.append((time.perf_counter() - started) * 1000)
+    return {"latency_ms": min(timings), "reply_bytes": listener.reply_bytes, "rows": len(result), "result": result}
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare reply size and latency of the leaderboard commands' queries with client-side and server-side aggregation.")
+    parser.add_argument("--uri", default="mongodb://localhost:27017")
+    parser.add_argument("--database", default="culvert-query-benchmark", help="Scratch database to seed. It is dropped before and after the benchmark.")
+    parser.add_argument("--members", type=int, default=200)
+    parser.add_argument("--dates", type=int, default=52)
+    parser.add_argument("--schemas", nargs="+", choices=SCORE_SCHEMAS, default=list(SCORE_SCHEMAS))
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write results to this JSON file.")
+    args = parser.parse_args()
+
+    listener = ReplyBytesListener()
+    db_client = MongoClient(args.uri, event_listeners=[listener])
+    db_client.drop_database(args.database)
+    db = db_client[args.database]
+    results = []
+    mismatches = 0
+    try:
+        ensure_indexes(db, [ARRAY_COLLECTION, ROWS_COLLECTION])
+        seed_database(db, args.members, args.dates, random.Random(args.seed))
+        print(f"{'schema':<8}{'command':<12}{'mode':<8}{'latency ms':>12}{'reply KiB':>12}{'rows':>7}")
+        for schema in args.schemas:
+            for command, query in BENCHMARK_QUERIES:
+                outputs = {}
+                for mode in QUERY_MODES:
+                    result = benchmark_query(create_score_repository(db, schema, mode), query, listener, args.repeats)
+                    outputs[mode] = result.pop("result")
+                    results.append({"schema": schema, "command": command, "mode": mode, **result})
+                    print(f"{schema:<8}{command:<12}{mode:<8}{result['latency_ms']:>12.2f}{result['reply_bytes'] / 1024:>12.1f}{result['rows']:>7}")
+                if sorted(outputs["server"], key=lambda x: x["name"]) != sorted(outputs["client"], key=lambda x: x["name"]):
+                    mismatches += 1
+                    print(f"Results differ between modes for {command} ({schema}).")
+    finally:
+        db_client.drop_database(args.database)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump({"settings": vars(args), "results": results}, file, indent=2)
+        print(f"\nResults written to {args.output}")
+    return 1 if mismatches else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+import sys
+import argparse
+from pymongo import ASCENDING, DESCENDING
+from pymongo.mongo_client import MongoClient
+from culvert_indexes import ensure_indexes, NAMES_COLLECTION
+from culvert_repository import ARRAY_COLLECTION, ROWS_COLLECTION
+
+COMMAND_QUERIES = [
+    ("member add/remove/update/search", NAMES_COLLECTION, {"name_lower": "member0"}, None),
+    ("culvert update_all (discord cleanup)", NAMES_COLLECTION, {"discord_id": "100"}, None),
+    ("member, culvert *_one (array)", ARRAY_COLLECTION, {"name": "member0"}, None),
+    ("saga date, culvert remove_all (array)", ARRAY_COLLECTION, {"date": "2024-01-01"}, None),
+    ("culvert remove_all range (array)", ARRAY_COLLECTION, {"date": {"$elemMatch": {"$gte": "2024-01-02", "$lte": "2024-01-04"}}}, None),
+    ("saga class (array)", ARRAY_COLLECTION, {"class": "hero"}, None),
+    ("saga member (rows)", ROWS_COLLECTION, {"name": "member0"}, [("date", ASCENDING)]),
+    ("culvert *_one (rows)", ROWS_COLLECTION, {"name": "member0", "date": "2024-01-01"}, None),
+    ("saga date, culvert remove_all (rows)", ROWS_COLLECTION, {"date": "2024-01-01"}, [("score", DESCENDING)]),
+    ("culvert remove_all range (rows)", ROWS_COLLECTION, {"date": {"$gte": "2024-01-02", "$lte": "2024-01-04"}}, None),
+    ("saga class (rows)", ROWS_COLLECTION, {"class": "hero"}, [("name", ASCENDING), ("date", ASCENDING)])
+]
+
+def seed_database(db, members=50, dates=8):
+    dates = [f"2024-01-{day:02d}" for day in range(1, dates + 1)]
+    db[NAMES_COLLECTION].insert_many([
+        {"name": f"Member{index}", "class": "hero", "discord_id": str(100 + index), "name_lower": f"member{index}"}
+        for index in range(members)
+    ])
+    db[ARRAY_COLLECTION].insert_many([
+        {"name": f"member{index}", "class": "hero", "level": 250, "score": [index * 100 for _ in dates], "date": list(dates)}
+        for index in range(members)
+    ])
+    db[ROWS_COLLECTION].insert_many([
+        {"name": f"member{index}", "class": "hero", "level": 250, "score": index * 100, "date": date}
+        for index in range(members)
+        for date in dates
+    ])
+
+def plan_stages(plan):
+    stages = [plan["stage"]]
+    if "inputStage" in plan:
+        stages += plan_stages(plan["inputStage"])
+    for input_stage in plan.get("inputStages", []):
+        stages += plan_stages(input_stage)
+    return stages
+
+def check_query(db, collection_name, query, sort):
+    cursor = db[collection_name].find(query)
+    if sort:
+        cursor = cursor.sort(sort)
+    winning_plan = cursor.explain()["queryPlanner"]["winningPlan"]
+    return plan_stages(winning_plan.get("queryPlan", winning_plan))
+
+def main():
+    parser = argparse.ArgumentParser(description="Explain each command's queries against a scratch database and confirm they use an index.")
+    parser.add_argument("--uri", default="mongodb://localhost:27017")
+    parser.add_argument("--database", default="culvert-query-plan-check", help="Scratch database to seed. It is dropped before and after the check.")
+    args = parser.parse_args()
+
+    db_client = MongoClient(args.uri)
+    db_client.drop_database(args.database)
+    db = db_client[args.database]
+    try:
+        ensure_indexes(db)
+        seed_database(db)
+        failures = 0
+        for command, collection_name, query, sort in COMMAND_QUERIES:
+            stages = check_query(db, collection_name, query, sort)
+            uses_index = "COLLSCAN" not in stages and "SORT" not in stages
+            failures += not uses_index
+            print(f"{'OK  ' if uses_index else 'FAIL'} {command:<40}{collection_name:<20}{' <- '.join(stages)}")
+    finally:
+        db_client.drop_database(args.database)
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())